@@ -1,45 +1,84 @@
 
 import os
-import shutil
+import re
+import asyncio
+import hashlib
+import json
 import uuid
+from contextlib import asynccontextmanager
 from typing import List, Optional
 
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException, BackgroundTasks
+from fastapi import FastAPI, APIRouter, Depends, UploadFile, File, Form, HTTPException, BackgroundTasks, WebSocket, WebSocketDisconnect, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
-import uvicorn
+from starlette.requests import HTTPConnection
 
 import sys
 # Add parent directory to path to find modules and config
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+# Only light modules are imported here; services that pull in the google SDKs
+# are built on first use by Services.
 from config import Config
-from modules.gen_questions import QuestionGenerator
-from modules.text_to_speech import TextToSpeech
-from modules.voice_engine import process_file
-from modules.vision_processor import VisionProcessor
-from modules.feedback import FeedbackGenerator
-
-app = FastAPI()
-
-# Enable CORS for frontend
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # In production, specify the frontend URL
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+from modules.voice_engine import (
+    process_file_async, transcribe_with_gemini_async, extract_metrics, analyze_tone_async, apply_word_estimate,
+    transcription_error
 )
+from modules.live_ingest import LiveTranscriber
+from modules import session_report
+from modules.storage import StorageManager
+from modules import capture_profile
+from modules import answer_window
+from modules.analytics import answer_record
+from modules.feedback import analyze_content_batch_with_gemini
+from modules.model_scheduler import scheduler, call_context, INTERACTIVE, NORMAL, BULK
+from modules.executors import run_in, IO_EXECUTOR, CPU_EXECUTOR, MODEL_EXECUTOR
+from modules.hedging import hedger, deadline, remaining
+from backend.services import Services
 
-# Initialize modules
-question_gen = QuestionGenerator()
-tts = TextToSpeech()
-vision = VisionProcessor()
-feedback_gen = FeedbackGenerator()
+router = APIRouter()
 
-# In-memory storage for session data (replace with database in production)
-sessions = {}
+def get_services(conn: HTTPConnection) -> Services:
+    return conn.app.state.services
+
+def create_app(services: Optional[Services] = None, warm_up: bool = True) -> FastAPI:
+    """
+    Builds the FastAPI app. Services are constructed lazily; with warm_up they are
+    built on a background thread after startup so the first request rarely pays for it.
+    """
+    services = services or Services()
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        def start():
+            # Nobody awaits this, so failures have to be reported here
+            try:
+                Config.ensure_dirs()
+                if warm_up:
+                    services.warm_up()
+                services.storage.start_sweeper()
+            except Exception as e:
+                print(f"[ERROR] Startup tasks failed; storage sweeper not running: {e}")
+        asyncio.get_running_loop().run_in_executor(IO_EXECUTOR, start)
+        yield
+        services.shutdown()
+
+    app = FastAPI(lifespan=lifespan)
+    app.state.services = services
+
+    # Enable CORS for frontend
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # In production, specify the frontend URL
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["ETag", "Content-Range", "Accept-Ranges", "Content-Location"],
+    )
+    app.include_router(router)
+
+    return app
 
 class InitSessionResponse(BaseModel):
     session_id: str
@@ -51,31 +90,35 @@ class AnalysisResponse(BaseModel):
     vision_metrics: dict
     feedback: dict
 
-@app.post("/api/interview/init", response_model=InitSessionResponse)
+@router.post("/api/interview/init", response_model=InitSessionResponse)
 async def init_interview(
     job_description: str = Form(...),
-    resume: UploadFile = File(...)
+    resume: UploadFile = File(...),
+    candidate_id: Optional[str] = Form(None),
+    services: Services = Depends(get_services)
 ):
+    sessions = services.sessions
     session_id = str(uuid.uuid4())
     
-    # Save resume temporarily
-    resume_path = os.path.join(Config.DATA_DIR, f"{session_id}_resume.pdf")
-    os.makedirs(Config.DATA_DIR, exist_ok=True)
-    
-    with open(resume_path, "wb") as buffer:
-        shutil.copyfileobj(resume.file, buffer)
+    # Save resume temporarily (expires with the "resume" TTL)
+    storage = await services.resolve("storage")
+    resume_path = await run_in(IO_EXECUTOR, storage.put_stream, resume.file, "resume", ".pdf")
         
     # Generate questions
     print(f"Generating questions for session {session_id}...")
     try:
-        q_data = question_gen.generate_interview_questions(job_description, resume_path)
+        question_gen = await services.resolve("question_gen")
+        q_data = await run_in(MODEL_EXECUTOR, question_gen.generate_interview_questions, job_description, resume_path)
         questions = q_data.get("questions", [])
         
         sessions[session_id] = {
+            # Without an id the answers are not added to any history
+            "candidate_id": candidate_id.strip() if candidate_id and candidate_id.strip() else None,
             "job_description": job_description,
             "resume_path": resume_path,
             "questions": questions,
-            "responses": {} 
+            "responses": {},
+            "aggregate": session_report.new_aggregate()
         }
         
         return {"session_id": session_id, "questions": questions}
@@ -83,60 +126,175 @@ async def init_interview(
         print(f"Error in init_interview: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/interview/{session_id}/question/{q_index}/audio")
-async def get_question_audio(session_id: str, q_index: int):
+# parse_range result for a well-formed range that lies entirely past the end of the file
+RANGE_UNSATISFIABLE = "unsatisfiable"
+
+def parse_range(range_header: str, size: int):
+    """
+    Parses a "bytes=" Range header into inclusive (start, end). Returns None when
+    the header should be ignored and the whole file sent: it is malformed, or asks
+    for several ranges (multipart responses aren't served).
+    """
+    specs = range_header.strip().split(",")
+    if len(specs) != 1:
+        return None
+    match = re.fullmatch(r"bytes=(\d*)-(\d*)", specs[0].strip())
+    if not match or (not match.group(1) and not match.group(2)):
+        return None
+    if match.group(1):
+        start = int(match.group(1))
+        end = int(match.group(2)) if match.group(2) else size - 1
+        if match.group(2) and end < start:
+            return None
+    else:
+        # Suffix range: the last N bytes
+        if int(match.group(2)) == 0:
+            return RANGE_UNSATISFIABLE
+        start = max(size - int(match.group(2)), 0)
+        end = size - 1
+    end = min(end, size - 1)
+    if start > end:
+        return RANGE_UNSATISFIABLE
+    return start, end
+
+async def media_response(services: Services, request: Request, path: str, media_type: str, immutable: bool) -> Response:
+    """
+    Serves a stored file with its content hash as ETag, answering If-None-Match
+    with 304 and Range requests with 206. Bytes come from the in-memory LRU;
+    misses are read on the I/O executor. HEAD gets the same headers without
+    reading the file.
+    """
+    etag = f'"{StorageManager.digest_of(path)}"'
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "public, max-age=31536000, immutable" if immutable else "no-cache"
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or etag in [t.strip() for t in if_none_match.split(",")]):
+        return Response(status_code=304, headers=headers)
+
+    head = request.method == "HEAD"
+    media_cache = await services.resolve("media_cache")
+    storage = await services.resolve("storage")
+    data = media_cache.cached(path)
+    if data is not None:
+        size = len(data)
+    elif head:
+        size = await run_in(IO_EXECUTOR, os.path.getsize, path)
+    else:
+        data = await run_in(IO_EXECUTOR, media_cache.get, path)
+        size = len(data)
+    storage.touch(path)
+
+    def body(start, end, status_code):
+        if head:
+            headers["Content-Length"] = str(end - start + 1)
+            return Response(status_code=status_code, headers=headers, media_type=media_type)
+        return Response(content=data[start:end + 1], status_code=status_code, headers=headers, media_type=media_type)
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (not if_range or if_range.strip() == etag):
+        byte_range = parse_range(range_header, size)
+        if byte_range == RANGE_UNSATISFIABLE:
+            headers["Content-Range"] = f"bytes */{size}"
+            return Response(status_code=416, headers=headers)
+        if byte_range is not None:
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+            return body(start, end, 206)
+
+    return body(0, size - 1, 200)
+
+@router.api_route("/api/media/question_audio/{digest}.wav", methods=["GET", "HEAD"])
+async def get_audio_by_digest(request: Request, digest: str, services: Services = Depends(get_services)):
+    """Content-addressed question audio; the URL changes whenever the bytes do, so it is cached forever."""
+    if not re.fullmatch(r"[0-9a-f]{64}", digest):
+        raise HTTPException(status_code=404, detail="Audio not found")
+    storage = await services.resolve("storage")
+    path = storage.object_path("question_audio", digest, ".wav")
+    if not storage.exists(path):
+        raise HTTPException(status_code=404, detail="Audio not found")
+    return await media_response(services, request, path, "audio/wav", immutable=True)
+
+@router.api_route("/api/interview/{session_id}/question/{q_index}/audio", methods=["GET", "HEAD"])
+async def get_question_audio(request: Request, session_id: str, q_index: int, services: Services = Depends(get_services)):
+    sessions = services.sessions
     if session_id not in sessions:
         raise HTTPException(status_code=404, detail="Session not found")
         
-    questions = sessions[session_id]["questions"]
-    if q_index < 0 or q_index >= len(questions):
+    if not question_in_range(sessions[session_id], q_index):
         raise HTTPException(status_code=404, detail="Question index out of range")
         
-    question_text = questions[q_index]
+    question_text = sessions[session_id]["questions"][q_index]
     
-    # Check if audio already exists
-    audio_path = os.path.join(Config.DATA_DIR, f"{session_id}_q{q_index}.wav")
-    if not os.path.exists(audio_path):
+    # Audio is keyed by question text, so the same question is synthesized once across sessions
+    text_key = hashlib.sha256(question_text.encode("utf-8")).hexdigest()
+    storage = await services.resolve("storage")
+    audio_path = storage.lookup("question_audio", text_key)
+    if audio_path is None:
         # Generate it
         print(f"Generating audio for q{q_index}...")
-        generated_path = tts.generate_audio(question_text, f"{session_id}_q{q_index}")
+        tts = await services.resolve("tts")
+        with call_context(session_id, INTERACTIVE):
+            generated_path = await tts.generate_audio_async(question_text, f"{session_id}_q{q_index}")
         if not generated_path:
              raise HTTPException(status_code=500, detail="TTS Generation failed")
-        # tts.generate_audio saves to predictable name, we might need to rename if logic differs
-        # The current tts.generate_audio saves to `question_{number}.wav` in DATA_DIR
-        # Use a custom modified version or rename
-        # For now, let's assume we modify tts to return the path it saved. 
-        # Actually my mock TTS saves to `question_{number}.wav` ignoring session.
-        # Let's fix that by renaming the file if needed.
-        if generated_path != audio_path:
-             if os.path.exists(generated_path):
-                 os.rename(generated_path, audio_path)
+        audio_path = await run_in(IO_EXECUTOR, storage.put_file, generated_path, "question_audio", key=text_key)
     
-    return FileResponse(audio_path, media_type="audio/wav")
+    # Revalidated on every replay (cheap 304); the immutable copy is advertised via Content-Location
+    response = await media_response(services, request, audio_path, "audio/wav", immutable=False)
+    response.headers["Content-Location"] = f"/api/media/question_audio/{StorageManager.digest_of(audio_path)}.wav"
+    return response
 
-@app.post("/api/interview/{session_id}/response/{q_index}")
+@router.get("/api/capture-profile")
+async def get_capture_profile():
+    """Resolution, frame rate, bitrates and codec the recorder should use."""
+    return capture_profile.capture_profile()
+
+@router.post("/api/interview/{session_id}/response/{q_index}")
 async def upload_response(
     session_id: str,
     q_index: int,
     video: UploadFile = File(...),
-    duration_seconds: float = Form(0)
+    duration_seconds: float = Form(0),
+    services: Services = Depends(get_services)
 ):
+    sessions = services.sessions
     if session_id not in sessions:
         raise HTTPException(status_code=404, detail="Session not found")
+    if not question_in_range(sessions[session_id], q_index):
+        raise HTTPException(status_code=404, detail="Question index out of range")
         
+    # Reject uploads that ignored the capture profile before storing them
+    video.file.seek(0, os.SEEK_END)
+    size_bytes = video.file.tell()
+    video.file.seek(0)
+    problem = capture_profile.check_upload(size_bytes, video.content_type, float(duration_seconds or 0))
+    if problem:
+        raise HTTPException(status_code=problem[0], detail=problem[1])
+
     # Save video
     ext = os.path.splitext(video.filename)[1]
     if not ext:
         ext = ".webm"
         
-    video_path = os.path.join(Config.DATA_DIR, f"{session_id}_resp_q{q_index}{ext}")
-    with open(video_path, "wb") as buffer:
-        shutil.copyfileobj(video.file, buffer)
+    def check_dimensions(path):
+        # Runs before the upload is committed, so a rejected file never counts against the quota
+        problem = capture_profile.check_dimensions(path)
+        if problem:
+            raise HTTPException(status_code=problem[0], detail=problem[1])
+
+    storage = await services.resolve("storage")
+    video_path = await run_in(IO_EXECUTOR, storage.put_stream, video.file, "response", ext, validate=check_dimensions)
         
     # Store path and duration
     if "responses" not in sessions[session_id]:
          sessions[session_id]["responses"] = {}
          
+    begin_take(sessions[session_id], q_index)
     sessions[session_id]["responses"][q_index] = {
         "video_path": video_path,
         "duration_seconds": float(duration_seconds) if duration_seconds else 0,
@@ -146,31 +304,132 @@ async def upload_response(
     print(f"Received response: {video_path}, duration: {duration_seconds}s")
     return {"status": "received", "path": video_path, "duration": duration_seconds}
 
-@app.post("/api/interview/{session_id}/analyze/{q_index}", response_model=AnalysisResponse)
-async def analyze_response(session_id: str, q_index: int):
-    if session_id not in sessions:
-        raise HTTPException(status_code=404, detail="Session not found")
-        
-    response_data = sessions[session_id]["responses"].get(q_index)
-    if not response_data:
-        raise HTTPException(status_code=404, detail="Response not found")
-        
-    video_path = response_data["video_path"]
-    question_text = sessions[session_id]["questions"][q_index]
-    actual_duration = response_data.get("duration_seconds", 0)
-    
-    # 1. Voice Analysis (Transcript + Metrics)
-    print(f"Running Voice Analysis... (actual duration: {actual_duration}s)")
-    voice_result = process_file(video_path)
-    if "error" in voice_result:
-        print(f"Voice error: {voice_result['error']}")
-    
-    # Recalculate metrics using actual duration from frontend
-    transcript = voice_result.get("transcript", "")
-    metrics = voice_result.get("metrics", {})
-    
+@router.websocket("/api/interview/{session_id}/response/{q_index}/live")
+async def live_response(websocket: WebSocket, session_id: str, q_index: int, services: Services = Depends(get_services)):
+    """
+    Live ingest: the recorder sends MediaRecorder chunks as binary frames while
+    recording. Rolling windows are transcribed in the background and interim
+    filler/pace counters are pushed back. A {"type": "stop"} text frame finishes
+    the take; the final transcript is stored so /analyze can skip transcription.
+    """
+    sessions = services.sessions
+    await websocket.accept()
+    if session_id not in sessions or not question_in_range(sessions[session_id], q_index):
+        await websocket.close(code=4404)
+        return
+
+    take = begin_take(sessions[session_id], q_index)
+    video_path = os.path.join(Config.DATA_DIR, f"{session_id}_resp_q{q_index}_t{take}.webm")
+    live = LiveTranscriber(video_path)
+    pending = None
+    duration_seconds = 0
+
+    async def run_window():
+        try:
+            with call_context(session_id, NORMAL):
+                metrics = await run_in(MODEL_EXECUTOR, live.transcribe_pending)
+        except Exception as e:
+            print(f"[ERROR] Live transcription window failed: {e}")
+            return
+        try:
+            await websocket.send_json({
+                "type": "interim",
+                "transcript": live.transcript,
+                "metrics": metrics
+            })
+        except (WebSocketDisconnect, RuntimeError):
+            # The client went away mid-window; the take is still stored below
+            pass
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+
+            if message.get("bytes"):
+                await run_in(IO_EXECUTOR, live.append_chunk, message["bytes"])
+                problem = capture_profile.check_upload(live.bytes_received, None, live.elapsed())
+                if problem:
+                    await websocket.send_json({"type": "error", "detail": problem[1]})
+                    await websocket.close(code=1009)
+                    if pending is not None:
+                        pending.cancel()
+                    await run_in(IO_EXECUTOR, discard_file, video_path)
+                    return
+                # Only one window in flight; the next one picks up whatever arrived meanwhile
+                if (pending is None or pending.done()) and live.window_due():
+                    pending = asyncio.create_task(run_window())
+            elif message.get("text"):
+                data = json.loads(message["text"])
+                if data.get("type") == "stop":
+                    duration_seconds = float(data.get("duration_seconds") or 0)
+                    break
+    except WebSocketDisconnect:
+        pass
+
+    # The take is either handed to the store or deleted; nothing is left in data/
+    stored_path = None
+    try:
+        if pending is not None:
+            await pending
+        if not live.bytes_received:
+            return
+        # Transcribe the tail that arrived after the last window
+        try:
+            with call_context(session_id, NORMAL):
+                await run_in(MODEL_EXECUTOR, live.transcribe_pending)
+        except Exception as e:
+            print(f"[ERROR] Live transcription of the tail failed: {e}")
+        duration = duration_seconds or live.elapsed()
+        storage = await services.resolve("storage")
+        stored_path = await run_in(IO_EXECUTOR, storage.put_file, video_path, "response")
+    finally:
+        if stored_path is None:
+            await run_in(IO_EXECUTOR, discard_file, video_path)
+
+    # Finishing the tail takes a while; an upload or retake in the meantime wins
+    if sessions[session_id]["takes"][q_index] != take:
+        print(f"Live response for q{q_index} superseded by a later take; not storing it")
+    else:
+        sessions[session_id].setdefault("responses", {})[q_index] = {
+            "video_path": stored_path,
+            "duration_seconds": duration,
+            "live_transcript": live.transcript,
+            "live_pause_count": live.pause_count,
+            "analyzed": False
+        }
+        print(f"Live response complete: {stored_path}, {live.bytes_received} bytes, duration: {duration:.1f}s")
+
+    try:
+        await websocket.send_json({
+            "type": "final",
+            "transcript": live.transcript,
+            "metrics": live.metrics(duration),
+            "path": stored_path
+        })
+        await websocket.close()
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+
+def begin_take(session: dict, q_index: int) -> int:
+    """Numbers each recording of a question; only the latest take may store its answer."""
+    takes = session.setdefault("takes", {})
+    takes[q_index] = takes.get(q_index, 0) + 1
+    return takes[q_index]
+
+def question_in_range(session: dict, q_index: int) -> bool:
+    return 0 <= q_index < len(session["questions"])
+
+def discard_file(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def apply_actual_duration(metrics: dict, transcript: str, actual_duration: float):
+    """Recomputes word count and WPM against the duration the frontend measured."""
     if actual_duration > 0 and transcript:
-        import re
         words = re.findall(r"\b[\w']+\b", transcript)
         word_count = len(words)
         # WPM = (words / seconds) * 60
@@ -179,36 +438,376 @@ async def analyze_response(session_id: str, q_index: int):
         metrics["duration_seconds"] = actual_duration
         metrics["pace_wpm"] = pace_wpm
         print(f"Recalculated: {word_count} words in {actual_duration}s = {pace_wpm} WPM")
+    elif actual_duration > 0 and metrics.get("estimated"):
+        # No transcript: rescale the signal-based word estimate to the real duration
+        word_count = metrics.get("word_count", 0)
+        metrics["duration_seconds"] = actual_duration
+        metrics["pace_wpm"] = int(round(word_count / actual_duration * 60))
+
+async def analysis_recording(services: Services, response_data: dict) -> str:
+    """
+    The file the model stages should see: the answer cropped to its speech window
+    (computed once and kept on the response), or the original when cropping
+    doesn't apply. The original stays at video_path for playback.
+    """
+    if "crop" not in response_data:
+        record = await run_in(CPU_EXECUTOR, answer_window.crop_to_speech, response_data["video_path"])
+        if record is not None:
+            storage = await services.resolve("storage")
+            record["path"] = await run_in(IO_EXECUTOR, storage.put_file, record["path"], "response")
+        response_data["crop"] = record
+    record = response_data["crop"]
+    return record["path"] if record else response_data["video_path"]
+
+def analysis_budget(budget_seconds: Optional[float]) -> float:
+    """Clients may ask for a shorter budget than Config.ANALYZE_BUDGET_SECONDS, never a longer one."""
+    if not budget_seconds or budget_seconds <= 0:
+        return Config.ANALYZE_BUDGET_SECONDS
+    return min(budget_seconds, Config.ANALYZE_BUDGET_SECONDS)
+
+def stage_deadline():
+    """Deadline for the voice and vision stages: the request's, minus time held back for feedback."""
+    return deadline(max(remaining() - Config.FEEDBACK_RESERVE_SECONDS, remaining() / 2))
+
+async def run_analysis(services: Services, session_id: str, q_index: int, budget_seconds: float = None) -> dict:
+    """
+    Runs voice and vision concurrently, then feedback, for one uploaded answer and
+    stores the result. Every stage finishes within the budget, degrading to local
+    estimates if the model can't.
+    """
+    with deadline(analysis_budget(budget_seconds)):
+        return await _run_analysis(services, session_id, q_index)
+
+async def _run_analysis(services: Services, session_id: str, q_index: int) -> dict:
+    sessions = services.sessions
+    response_data = sessions[session_id]["responses"][q_index]
+    question_text = sessions[session_id]["questions"][q_index]
+    actual_duration = response_data.get("duration_seconds", 0)
+    
+    vision = await services.resolve("vision")
+    feedback_gen = await services.resolve("feedback_gen")
+    live_transcript = response_data.get("live_transcript") or None
+    analysis_path = await analysis_recording(services, response_data)
+
+    # 1. Voice Analysis (Transcript + Metrics) and 2. Vision Analysis don't depend on each other
+    print(f"Running Voice and Vision Analysis... (actual duration: {actual_duration}s)")
+    with stage_deadline():
+        voice_result, vision_result = await asyncio.gather(
+            process_file_async(
+                analysis_path,
+                transcript=live_transcript,
+                pause_count=response_data.get("live_pause_count")
+            ),
+            vision.analyze_video_async(analysis_path)
+        )
+    if "error" in voice_result:
+        print(f"Voice error: {voice_result['error']}")
+    if response_data["crop"]:
+        answer_window.restore_timing(voice_result, response_data["crop"], count_leading_pause=live_transcript is None)
+    
+    # Recalculate metrics using actual duration from frontend
+    transcript = voice_result.get("transcript", "")
+    metrics = voice_result.get("metrics", {})
+    apply_actual_duration(metrics, transcript, actual_duration)
         
-    # 2. Vision Analysis
-    print("Running Vision Analysis...")
-    vision_result = vision.analyze_video(video_path)
     if "error" in vision_result:
         print(f"Vision error: {vision_result['error']}")
         
     # 3. Generate Feedback
     print("Generating Feedback...")
-    feedback = feedback_gen.generate_feedback(
+    feedback = await feedback_gen.generate_feedback_async(
         transcript=transcript,
         voice_metrics=metrics,
         vision_metrics=vision_result,
         question=question_text
     )
     
-    # Store results
-    sessions[session_id]["responses"][q_index]["analysis"] = {
+    return await store_analysis(services, session_id, q_index, voice_result, vision_result, feedback)
+
+async def store_analysis(services: Services, session_id: str, q_index: int,
+                         voice_result: dict, vision_result: dict, feedback: dict) -> dict:
+    """
+    Saves a finished analysis on the session, folds it into the session aggregate
+    and the candidate's history, and returns the /analyze shape.
+    """
+    session = services.sessions[session_id]
+    response_data = session["responses"][q_index]
+    response_data["analysis"] = {
         "voice": voice_result,
         "vision": vision_result,
         "feedback": feedback
     }
-    
+    response_data["analyzed"] = True
+    # An answer with no usable audio (missing or evicted file) would count as 0 words at 0 WPM
+    if "error" not in voice_result:
+        session_report.add_answer(session["aggregate"], q_index, voice_result.get("metrics", {}))
+        if session.get("candidate_id"):
+            record = answer_record(session_id, q_index, session["questions"][q_index], voice_result, vision_result)
+            analytics = await services.resolve("analytics")
+            await run_in(IO_EXECUTOR, analytics.record_answer, session["candidate_id"], record)
+    else:
+        session_report.remove_answer(session["aggregate"], q_index)
+    return stored_analysis(response_data)
+
+def stored_analysis(response_data: dict) -> dict:
+    """Rebuilds the /analyze response shape from a stored analysis."""
+    analysis = response_data["analysis"]
+    voice_result = analysis["voice"]
     return {
-        "transcript": transcript,
-        "voice_metrics": metrics,
-        "vision_metrics": vision_result,
-        "feedback": feedback,
+        "transcript": voice_result.get("transcript", ""),
+        "voice_metrics": voice_result.get("metrics", {}),
+        "vision_metrics": analysis["vision"],
+        "feedback": analysis["feedback"],
         "analysis": voice_result.get("analysis", {})
     }
 
+@router.post("/api/interview/{session_id}/analyze/{q_index}", response_model=AnalysisResponse)
+async def analyze_response(session_id: str, q_index: int, budget_seconds: float = Config.ANALYZE_BUDGET_SECONDS,
+                           services: Services = Depends(get_services)):
+    sessions = services.sessions
+    if session_id not in sessions:
+        raise HTTPException(status_code=404, detail="Session not found")
+        
+    response_data = sessions[session_id]["responses"].get(q_index)
+    if not response_data:
+        raise HTTPException(status_code=404, detail="Response not found")
+        
+    with call_context(session_id, NORMAL):
+        return await run_analysis(services, session_id, q_index, budget_seconds)
+
+async def stream_analysis(services: Services, session_id: str, q_index: int, budget_seconds: float = None):
+    """
+    Runs the same stages as run_analysis but yields each result as soon as it exists:
+    metrics, transcript, tone and vision (whichever finishes first), then feedback tokens.
+    Bounded by the same budget; if the client goes away, outstanding stages are cancelled.
+    """
+    session = services.sessions[session_id]
+    response_data = session["responses"][q_index]
+    question_text = session["questions"][q_index]
+    actual_duration = response_data.get("duration_seconds", 0)
+    live_transcript = response_data.get("live_transcript") or None
+
+    def event(kind, **payload):
+        return json.dumps({"type": kind, **payload}) + "\n"
+
+    vision = await services.resolve("vision")
+    feedback_gen = await services.resolve("feedback_gen")
+    tasks = []
+
+    with call_context(session_id, NORMAL), deadline(analysis_budget(budget_seconds)):
+        try:
+            # 1. Local metrics: available immediately when live ingest already transcribed
+            metrics = extract_metrics(live_transcript or "", duration_seconds=actual_duration or 30.0)
+            metrics["pause_count"] = response_data.get("live_pause_count", 0)
+            apply_actual_duration(metrics, live_transcript, actual_duration)
+            yield event("metrics", voice_metrics=metrics)
+
+            # Every model stage sees the answer cropped to its speech window
+            analysis_path = await analysis_recording(services, response_data)
+            crop = response_data["crop"]
+            # Same guard as process_file_async: a missing or evicted recording has no usable audio
+            missing = not await run_in(IO_EXECUTOR, os.path.exists, analysis_path)
+
+            with stage_deadline():
+                # Tone and vision don't depend on the transcript, so start them right away
+                tone_task = asyncio.create_task(analyze_tone_async(analysis_path))
+                vision_task = asyncio.create_task(vision.analyze_video_async(analysis_path))
+                tasks += [tone_task, vision_task]
+
+                # 2. Transcript
+                if missing:
+                    stt_result = {"text": "", "segments": [], "pause_count": 0,
+                                  "error": f"File not found: {analysis_path}"}
+                elif live_transcript is not None:
+                    stt_result = {"text": live_transcript, "segments": [], "pause_count": metrics["pause_count"]}
+                else:
+                    stt_result = await transcribe_with_gemini_async(analysis_path)
+            transcript = stt_result.get("text", "")
+            segments = stt_result.get("segments", [])
+            metrics = extract_metrics(transcript, segments, duration_seconds=actual_duration or 30.0)
+            metrics["pause_count"] = stt_result.get("pause_count", 0)
+            if stt_result.get("degraded"):
+                apply_word_estimate(metrics, stt_result)
+            if crop:
+                answer_window.restore_timing(
+                    {"segments": segments, "metrics": metrics}, crop, count_leading_pause=live_transcript is None
+                )
+            apply_actual_duration(metrics, transcript, actual_duration)
+            yield event("transcript", transcript=transcript, voice_metrics=metrics)
+
+            # 3. Tone and vision, in completion order
+            results = {}
+            pending = {tone_task: "analysis", vision_task: "vision_metrics"}
+            while pending:
+                finished, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    key = pending.pop(task)
+                    try:
+                        results[key] = task.result()
+                    except Exception as e:
+                        results[key] = {"error": str(e)}
+                    yield event(key, **{key: results[key]})
+
+            # 4. Feedback: prose streamed token by token, structured fields alongside
+            vision_result = results["vision_metrics"]
+            structured_task = asyncio.create_task(feedback_gen.score_answer_async(
+                transcript, metrics, vision_result, question_text, False
+            ))
+            tasks.append(structured_task)
+            prose = []
+            try:
+                async for token in feedback_gen.stream_feedback_async(
+                    transcript, metrics, vision_result, question_text
+                ):
+                    prose.append(token)
+                    yield event("feedback_token", text=token)
+            except Exception as e:
+                print(f"Feedback stream error: {e}")
+            feedback = await structured_task
+            if prose:
+                feedback["content_feedback"] = "".join(prose)
+        finally:
+            # Nobody will read these results once the client has disconnected
+            for task in tasks:
+                task.cancel()
+
+    voice_result = {
+        "transcript": transcript,
+        "segments": segments,
+        "metrics": metrics,
+        "analysis": results["analysis"]
+    }
+    voice_error = transcription_error(stt_result)
+    if voice_error:
+        print(f"Voice error: {voice_error}")
+        voice_result["error"] = voice_error
+    result = await store_analysis(services, session_id, q_index, voice_result, vision_result, feedback)
+    yield event("done", **result)
+
+@router.post("/api/interview/{session_id}/analyze/{q_index}/stream")
+async def analyze_response_stream(session_id: str, q_index: int, budget_seconds: float = Config.ANALYZE_BUDGET_SECONDS,
+                                  services: Services = Depends(get_services)):
+    """NDJSON variant of /analyze: one JSON event per line as each stage completes."""
+    sessions = services.sessions
+    if session_id not in sessions:
+        raise HTTPException(status_code=404, detail="Session not found")
+    if not sessions[session_id]["responses"].get(q_index):
+        raise HTTPException(status_code=404, detail="Response not found")
+
+    return StreamingResponse(
+        stream_analysis(services, session_id, q_index, budget_seconds),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/api/interview/{session_id}/report")
+async def get_session_report(session_id: str, services: Services = Depends(get_services)):
+    """
+    Whole-interview report. Answers that were uploaded but not analyzed yet are
+    analyzed concurrently (capped by Config.REPORT_MAX_CONCURRENCY); finished
+    answers are reused from the session.
+    """
+    sessions = services.sessions
+    if session_id not in sessions:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    session = sessions[session_id]
+    # Sessions from before uploads were range-checked may hold answers to no question
+    responses = {q: r for q, r in session["responses"].items() if question_in_range(session, q)}
+    semaphore = asyncio.Semaphore(Config.REPORT_MAX_CONCURRENCY)
+
+    async def analyze_pending(q_index):
+        async with semaphore:
+            # Another request may have finished it while we waited
+            if responses[q_index].get("analyzed"):
+                return
+            try:
+                # Nobody is watching a single answer here, so yield to interactive calls
+                with call_context(session_id, BULK):
+                    await run_analysis(services, session_id, q_index)
+            except Exception as e:
+                print(f"Error analyzing q{q_index} for report: {e}")
+                responses[q_index]["error"] = str(e)
+
+    pending = [q for q, r in responses.items() if not r.get("analyzed")]
+    if pending:
+        print(f"Report: analyzing {len(pending)} pending answers...")
+        await asyncio.gather(*(analyze_pending(q) for q in pending))
+
+    # Content scores for every analyzed answer, several answers per model request
+    unscored = [q for q in sorted(responses) if responses[q].get("analyzed") and "content" not in responses[q]]
+    if unscored:
+        items = [
+            (session["questions"][q], responses[q]["analysis"]["voice"].get("transcript", ""))
+            for q in unscored
+        ]
+        with call_context(session_id, BULK):
+            scores = await run_in(MODEL_EXECUTOR, analyze_content_batch_with_gemini, items)
+        analytics = await services.resolve("analytics")
+        for q_index, content in zip(unscored, scores):
+            if "error" not in content:
+                responses[q_index]["content"] = content
+                if session.get("candidate_id"):
+                    await run_in(IO_EXECUTOR, analytics.record_content,
+                                 session["candidate_id"], session_id, q_index, content)
+
+    answers = []
+    for q_index in sorted(responses):
+        response_data = responses[q_index]
+        entry = {"q_index": q_index, "question": session["questions"][q_index]}
+        if response_data.get("analyzed"):
+            entry.update(stored_analysis(response_data))
+            entry["content"] = response_data.get("content")
+        else:
+            entry["error"] = response_data.get("error", "Analysis failed")
+        answers.append(entry)
+
+    return {
+        "session_id": session_id,
+        "summary": session_report.summarize(session["aggregate"]),
+        "answers": answers
+    }
+
+@router.get("/api/candidates/{candidate_id}/progress")
+async def get_candidate_progress(candidate_id: str, sessions: int = Config.PROGRESS_DEFAULT_SESSIONS,
+                                 services: Services = Depends(get_services)):
+    """Per-session delivery and content trends over the candidate's last N sessions."""
+    analytics = await services.resolve("analytics")
+    return await run_in(IO_EXECUTOR, analytics.progress, candidate_id, max(1, sessions))
+
+@router.get("/api/candidates/{candidate_id}/progress/daily")
+async def get_candidate_daily_progress(candidate_id: str, days: int = 30, services: Services = Depends(get_services)):
+    """The same trends bucketed by calendar day."""
+    analytics = await services.resolve("analytics")
+    return {"days": await run_in(IO_EXECUTOR, analytics.daily, candidate_id, max(1, days))}
+
+@router.get("/api/candidates/{candidate_id}/answers")
+async def search_candidate_answers(candidate_id: str, term: str, limit: int = 20, services: Services = Depends(get_services)):
+    """Past answers containing a filler phrase or keyword, most recent first."""
+    analytics = await services.resolve("analytics")
+    return {"answers": await run_in(IO_EXECUTOR, analytics.search, candidate_id, term, max(1, limit))}
+
+@router.get("/api/metrics/hedging")
+async def get_hedging_metrics():
+    """Per-stage call, hedge and fallback counts, and the current hedge thresholds."""
+    return hedger.metrics()
+
+@router.get("/api/health")
+async def health():
+    """Liveness probe; answers from the event loop alone, so it stays fast under load."""
+    return {"status": "ok"}
+
+@router.get("/api/metrics/scheduler")
+async def get_scheduler_metrics():
+    """Queue depth, in-flight count and wait times of the model call scheduler."""
+    return scheduler.metrics()
+
+app = create_app()
+
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    import uvicorn
+    from modules import executors
+    try:
+        uvicorn.run(app, host="0.0.0.0", port=8000)
+    finally:
+        executors.shutdown()
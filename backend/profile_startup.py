@@ -0,0 +1,71 @@
+
+"""
+Import-time profile of the backend.
+
+Runs a fresh interpreter with -X importtime, imports backend.app and builds the
+app, then prints the slowest imports and the total cold-start time.
+
+Usage: python backend/profile_startup.py [--top N]
+"""
+import os
+import sys
+import argparse
+import subprocess
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+PROBE = """
+import time
+start = time.perf_counter()
+import backend.app
+imported = time.perf_counter()
+backend.app.create_app(warm_up=False)
+built = time.perf_counter()
+print(f"IMPORT_SECONDS={imported - start:.4f}")
+print(f"CREATE_APP_SECONDS={built - imported:.4f}")
+"""
+
+
+def parse_importtime(stderr: str) -> list:
+    """Parses -X importtime output into (cumulative_us, self_us, depth, module) tuples."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        except ValueError:
+            continue
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((int(cumulative_us), int(self_us), depth, name.strip()))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--top", type=int, default=15, help="number of slowest imports to show")
+    args = parser.parse_args()
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=BASE_DIR, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        print(result.stderr[-2000:])
+        sys.exit(result.returncode)
+
+    rows = parse_importtime(result.stderr)
+    timings = dict(line.split("=", 1) for line in result.stdout.splitlines() if "=" in line)
+
+    print(f"Slowest imports (cumulative, top {args.top}):")
+    for cumulative_us, self_us, depth, name in sorted(rows, reverse=True)[:args.top]:
+        print(f"  {cumulative_us / 1000:9.1f} ms  (self {self_us / 1000:7.1f} ms)  {'  ' * depth}{name}")
+
+    heavy = [name for _, _, _, name in rows if name.startswith(("google", "cv2", "pyaudio"))]
+    print(f"\nHeavy SDK modules loaded at import: {len(heavy)}" + (f" ({', '.join(heavy[:5])}...)" if heavy else ""))
+    print(f"import backend.app: {float(timings.get('IMPORT_SECONDS', 0)) * 1000:.1f} ms")
+    print(f"create_app():       {float(timings.get('CREATE_APP_SECONDS', 0)) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
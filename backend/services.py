@@ -0,0 +1,112 @@
+
+import os
+import sys
+import threading
+
+# Add parent directory to path to find modules and config
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+class Services:
+    """
+    Lazily built service singletons for the backend.
+
+    Nothing heavy is imported or constructed until a handler first asks for it,
+    so a worker starts accepting traffic before the google SDKs are loaded.
+    Pass instances as keyword arguments to override them (e.g. in tests):
+
+        Services(tts=FakeTTS(), sessions={})
+    """
+
+    def __init__(self, **overrides):
+        self._instances = dict(overrides)
+        self._lock = threading.Lock()
+        # In-memory storage for session data (replace with database in production)
+        self.sessions = self._instances.pop("sessions", {})
+
+    def _get(self, name, factory):
+        instance = self._instances.get(name)
+        if instance is None:
+            with self._lock:
+                instance = self._instances.get(name)
+                if instance is None:
+                    instance = factory()
+                    self._instances[name] = instance
+        return instance
+
+    @property
+    def question_gen(self):
+        def build():
+            from modules.gen_questions import QuestionGenerator
+            return QuestionGenerator()
+        return self._get("question_gen", build)
+
+    @property
+    def tts(self):
+        def build():
+            from modules.text_to_speech import TextToSpeech
+            return TextToSpeech()
+        return self._get("tts", build)
+
+    @property
+    def vision(self):
+        def build():
+            from modules.vision_processor import VisionProcessor
+            return VisionProcessor()
+        return self._get("vision", build)
+
+    @property
+    def feedback_gen(self):
+        def build():
+            from modules.feedback import FeedbackGenerator
+            return FeedbackGenerator()
+        return self._get("feedback_gen", build)
+
+    @property
+    def storage(self):
+        def build():
+            from modules.storage import StorageManager
+            return StorageManager()
+        return self._get("storage", build)
+
+    @property
+    def media_cache(self):
+        def build():
+            from modules.media_cache import BytesLRU
+            return BytesLRU()
+        return self._get("media_cache", build)
+
+    async def resolve(self, name):
+        """Returns a service from a coroutine, building it on a worker thread on first use."""
+        instance = self._instances.get(name)
+        if instance is None:
+            from modules.executors import run_in, IO_EXECUTOR
+            instance = await run_in(IO_EXECUTOR, getattr, self, name)
+        return instance
+
+    @property
+    def analytics(self):
+        def build():
+            from modules.analytics import AnalyticsStore
+            return AnalyticsStore()
+        return self._get("analytics", build)
+
+    def warm_up(self):
+        """Builds every service; call from a background thread after startup."""
+        for name in ("storage", "question_gen", "tts", "vision", "feedback_gen", "media_cache", "analytics"):
+            try:
+                getattr(self, name)
+            except Exception as e:
+                print(f"[WARN] Could not initialize {name}: {e}")
+
+    def shutdown(self):
+        """
+        Stops this app's background work. The executor pools are process-wide and
+        shared by every app built in the process, so they are left running.
+        """
+        storage = self._instances.get("storage")
+        if storage is not None:
+            storage.stop_sweeper()
+        analytics = self._instances.get("analytics")
+        if analytics is not None:
+            analytics.flush()
@@ -19,6 +19,81 @@ class Config:
     TEMPERATURE = 0.7
     MAX_OUTPUT_TOKENS = 2048
     MAX_QUESTIONS = 5
+    # Model calls allowed in flight at once across all sessions (provider rate limit)
+    MODEL_MAX_CONCURRENCY = 4
+    # Answers scored per model request by batched content scoring
+    CONTENT_BATCH_SIZE = 8
+
+    # --- EXECUTORS ---
+    # Thread pools for blocking work kept off the event loop
+    IO_WORKERS = 8                          # file copies, storage, media reads
+    CPU_WORKERS = os.cpu_count() or 2       # ffmpeg/ffprobe, NumPy prosody
+    MODEL_SDK_WORKERS = 16                  # SDK calls with no async variant (uploads, file polling)
+
+    # --- CAPTURE PROFILE ---
+    # The backend only needs a face-sized frame and speech-quality audio, so the
+    # recorder is asked for this instead of whatever the browser defaults to
+    CAPTURE_PROFILE = {
+        "width": 320,
+        "height": 240,
+        "frame_rate": 15,
+        "video_bits_per_second": 250_000,
+        "audio_bits_per_second": 32_000,
+        "mime_type": "video/webm;codecs=vp8,opus",
+        # Tried in order when the browser can't record mime_type (Safari only records MP4)
+        "fallback_mime_types": ["video/mp4"],
+        "max_duration_seconds": 180,
+    }
+    # Uploads may exceed the nominal bitrate by this factor (VBR, container overhead)
+    CAPTURE_SIZE_TOLERANCE = 1.5
+    CAPTURE_SIZE_SLACK_BYTES = 256 * 1024
+
+    # --- TONE ANALYSIS ---
+    # Tone labels come from local prosody features; set to ask Gemini for the emotion label too
+    PROSODY_MODEL_EMOTION = False
+
+    # --- LIVE INGEST ---
+    # Seconds of new audio to accumulate before transcribing the next window
+    LIVE_WINDOW_SECONDS = 8
+    # Each window re-reads this much of the previous one so words cut at the seam are heard whole
+    LIVE_WINDOW_OVERLAP_SECONDS = 2
+
+    # --- ANSWER WINDOW ---
+    # Leading/trailing silence is cropped before analysis when it saves at least this much
+    TRIM_MIN_SAVINGS_SECONDS = 1.5
+    # Kept around the detected speech so first and last syllables aren't clipped
+    TRIM_PADDING_SECONDS = 0.5
+
+    # --- QUESTION BANK ---
+    # Questions are retrieved from the local bank; set to have Gemini tailor them afterwards
+    QUESTION_LLM_ENRICH = False
+    QUESTION_COUNT = 5
+    QUESTION_MAX_PER_CATEGORY = 2
+    # Resume terms count this much relative to the job description when ranking
+    QUESTION_RESUME_WEIGHT = 0.5
+    QUESTION_HASH_DIM = 4096
+
+    # --- DEADLINES & HEDGING ---
+    # End-to-end budget of one /analyze request; the frontend gives up at 180s
+    ANALYZE_BUDGET_SECONDS = 170
+    # Held back from voice/vision so feedback still has time to run
+    FEEDBACK_RESERVE_SECONDS = 20
+    # A stage sends one duplicate request once it runs past its recent p95 latency
+    HEDGE_MAX_RATIO = 0.1           # at most this share of calls may be hedged
+    HEDGE_LATENCY_WINDOW = 200      # recent latencies per stage used for the p95
+    HEDGE_MIN_SAMPLES = 20
+    HEDGE_DEFAULT_AFTER_SECONDS = 45
+    # The hedge clock starts once a call holds a scheduler slot and nothing is queued
+    # behind it; until then the hedger checks again this often
+    HEDGE_BACKLOG_RECHECK_SECONDS = 0.25
+    # The face-detector vision fallback only runs once the stage deadline has passed,
+    # so it samples at most this many frames and stops after this long
+    VISION_FALLBACK_MAX_FRAMES = 60
+    VISION_FALLBACK_SECONDS = 4
+
+    # --- SESSION REPORT ---
+    # Max answers analyzed at once when building a whole-interview report
+    REPORT_MAX_CONCURRENCY = 3
     
     # --- FILE SYSTEM PATHS ---
     BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -26,8 +101,37 @@ class Config:
     ANSWER_AUDIOS_DIR = os.path.join(DATA_DIR, "answer_audios")
     ANSWER_VIDEOS_DIR = os.path.join(DATA_DIR, "answer_videos")
     QUESTION_AUDIOS_DIR = os.path.join(DATA_DIR, "question_audios")
+    STORAGE_DIR = os.path.join(DATA_DIR, "store")
+    ANALYTICS_DIR = os.path.join(DATA_DIR, "analytics")
+    QUESTION_BANK_PATH = os.path.join(DATA_DIR, "question_bank.json")
+    QUESTION_INDEX_DIR = os.path.join(DATA_DIR, "index")
+
+    # --- STORAGE LIFECYCLE ---
+    # Artifacts older than their kind's TTL are deleted by the background sweeper
+    STORAGE_TTL_SECONDS = {
+        "resume": 24 * 3600,
+        "response": 7 * 24 * 3600,
+        "recording": 7 * 24 * 3600,
+        "question_audio": 30 * 24 * 3600,
+    }
+    # Least recently used artifacts are evicted once the store exceeds this size
+    STORAGE_QUOTA_BYTES = 5 * 1024 ** 3
+    STORAGE_SWEEP_INTERVAL = 300
+
+    # --- PROGRESS ANALYTICS ---
+    # Aggregates are snapshotted every N appended records; the log tail is replayed on load
+    ANALYTICS_SNAPSHOT_EVERY = 10
+    # Candidates whose aggregates stay in memory; the least recently used are snapshotted and dropped
+    ANALYTICS_MAX_LOADED = 256
+    PROGRESS_DEFAULT_SESSIONS = 30
+
+    # --- MEDIA CACHE ---
+    # In-memory LRU of hot question audio, served without touching disk
+    MEDIA_CACHE_MAX_BYTES = 64 * 1024 ** 2
+    MEDIA_CACHE_MAX_ITEM_BYTES = 8 * 1024 ** 2
 
-    # Ensure directories exist
-    for _dir in [DATA_DIR, ANSWER_AUDIOS_DIR, ANSWER_VIDEOS_DIR, QUESTION_AUDIOS_DIR]:
-        if not os.path.exists(_dir):
-            os.makedirs(_dir)
\ No newline at end of file
+    @classmethod
+    def ensure_dirs(cls):
+        """Creates the data directories. Called by entry points, not at import time."""
+        for _dir in [cls.DATA_DIR, cls.ANSWER_AUDIOS_DIR, cls.ANSWER_VIDEOS_DIR, cls.QUESTION_AUDIOS_DIR]:
+            os.makedirs(_dir, exist_ok=True)
@@ -90,14 +90,15 @@ Generated by AI Interview Coach
     URL.revokeObjectURL(url);
 };
 
-const AnalysisDashboard = ({ data = {}, onNext, isLastQuestion, question }) => {
+const AnalysisDashboard = ({ data = {}, onNext, isLastQuestion, question, isStreaming = false }) => {
     const transcript = safeString(data.transcript) || "Response recorded";
     const vm = data.voice_metrics || {};
     const vis = data.vision_metrics || {};
     const fb = data.feedback || {};
     const an = data.analysis || {};
 
-    const score = typeof fb.score === 'number' ? fb.score : 75;
+    const hasScore = typeof fb.score === 'number';
+    const score = hasScore ? fb.score : 75;
     const strengths = safeArray(fb.strengths);
     const improvements = safeArray(fb.improvements);
 
@@ -123,7 +124,7 @@ const AnalysisDashboard = ({ data = {}, onNext, isLastQuestion, question }) => {
                     <div className="score-label">Performance Score</div>
                     <div className="score-sublabel">Based on content & delivery</div>
                 </div>
-                <div className="score-value">{score}</div>
+                <div className="score-value">{isStreaming && !hasScore ? '…' : score}</div>
             </div>
 
             {/* Transcript */}
@@ -177,6 +178,12 @@ const AnalysisDashboard = ({ data = {}, onNext, isLastQuestion, question }) => {
             </div>
 
             {/* Content Feedback */}
+            {isStreaming && !fb.content_feedback && (
+                <div className="feedback-section">
+                    <div className="feedback-title">💡 Detailed Feedback</div>
+                    <p style={{ color: '#9ca3af', margin: 0 }}>Still analyzing your answer…</p>
+                </div>
+            )}
             {fb.content_feedback && (
                 <div className="feedback-section">
                     <div className="feedback-title">💡 Detailed Feedback</div>
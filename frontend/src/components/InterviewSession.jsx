@@ -1,15 +1,38 @@
 
-import React, { useState, useRef } from 'react';
+import React, { useState, useRef, useEffect } from 'react';
 import axios from 'axios';
 import VideoRecorder from './VideoRecorder';
 import AnalysisDashboard from './AnalysisDashboard';
 
+// How long we wait for an analysis before giving up
+const ANALYSIS_TIMEOUT_MS = 180000;
+
 const InterviewSession = ({ sessionId, questions = [], onExit }) => {
     const [currentQuestionIndex, setCurrentQuestionIndex] = useState(0);
     const [phase, setPhase] = useState('question');
     const [analysisData, setAnalysisData] = useState(null);
+    const [isStreaming, setIsStreaming] = useState(false);
     const [error, setError] = useState(null);
+    const [captureProfile, setCaptureProfile] = useState(null);
+    const [profileFailed, setProfileFailed] = useState(false);
     const audioRef = useRef(null);
+    const receivedAnalysisRef = useRef(false);
+
+    // Recording settings published by the backend. Recording waits for them: with browser
+    // defaults the upload would exceed the profile's size limit and be rejected
+    const loadCaptureProfile = () => {
+        setProfileFailed(false);
+        axios.get('http://localhost:8000/api/capture-profile')
+            .then(res => setCaptureProfile(res.data))
+            .catch(err => {
+                console.error("Could not load capture profile:", err);
+                setProfileFailed(true);
+            });
+    };
+
+    useEffect(() => {
+        loadCaptureProfile();
+    }, []);
 
     const currentQuestion = questions[currentQuestionIndex] || "Tell me about yourself.";
 
@@ -21,36 +44,88 @@ const InterviewSession = ({ sessionId, questions = [], onExit }) => {
         } catch (e) { console.error(e); }
     };
 
-    // Now receives both videoBlob and duration from VideoRecorder
-    const handleRecordingComplete = async (videoBlob, durationSeconds) => {
+    // Reads the NDJSON analysis stream, merging each event into the dashboard data as it arrives
+    const streamAnalysis = async () => {
+        const controller = new AbortController();
+        const timeout = setTimeout(() => controller.abort(), ANALYSIS_TIMEOUT_MS);
+        // The backend finishes (degrading slow stages) a little before we would give up
+        const budgetSeconds = ANALYSIS_TIMEOUT_MS / 1000 - 10;
+        try {
+            const response = await fetch(
+                `http://localhost:8000/api/interview/${sessionId}/analyze/${currentQuestionIndex}/stream?budget_seconds=${budgetSeconds}`,
+                { method: 'POST', signal: controller.signal }
+            );
+            if (!response.ok || !response.body) {
+                throw new Error(`Analysis stream failed: ${response.status}`);
+            }
+
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffered = '';
+            let data = {};
+            setIsStreaming(true);
+
+            while (true) {
+                const { value, done } = await reader.read();
+                if (done) break;
+                buffered += decoder.decode(value, { stream: true });
+                const lines = buffered.split('\n');
+                buffered = lines.pop();
+
+                for (const line of lines) {
+                    if (!line.trim()) continue;
+                    const { type, ...payload } = JSON.parse(line);
+                    if (type === 'feedback_token') {
+                        const feedback = data.feedback || {};
+                        data = { ...data, feedback: { ...feedback, content_feedback: (feedback.content_feedback || '') + payload.text } };
+                    } else {
+                        data = { ...data, ...payload };
+                    }
+                    receivedAnalysisRef.current = true;
+                    setAnalysisData(data);
+                    setPhase('results');
+                }
+            }
+            console.log('Analysis:', data);
+        } finally {
+            clearTimeout(timeout);
+            setIsStreaming(false);
+        }
+    };
+
+    // Now receives both videoBlob and duration from VideoRecorder.
+    // streamed is true when the live socket already delivered and transcribed the answer.
+    const handleRecordingComplete = async (videoBlob, durationSeconds, streamed = false) => {
         setPhase('analyzing');
         setError(null);
+        receivedAnalysisRef.current = false;
 
         try {
-            // Upload video with duration
-            const formData = new FormData();
-            formData.append('video', videoBlob, 'response.webm');
-            formData.append('duration_seconds', durationSeconds.toString());
-
-            await axios.post(
-                `http://localhost:8000/api/interview/${sessionId}/response/${currentQuestionIndex}`,
-                formData,
-                { timeout: 30000 }
-            );
-
-            // Get analysis
-            const result = await axios.post(
-                `http://localhost:8000/api/interview/${sessionId}/analyze/${currentQuestionIndex}`,
-                {},
-                { timeout: 180000 }
-            );
+            // Upload video with duration, unless it was already streamed
+            if (!streamed) {
+                const formData = new FormData();
+                // The blob carries the container the browser really recorded (webm, or mp4 on Safari)
+                const extension = videoBlob.type === 'video/mp4' ? 'mp4' : 'webm';
+                formData.append('video', videoBlob, `response.${extension}`);
+                formData.append('duration_seconds', durationSeconds.toString());
+
+                await axios.post(
+                    `http://localhost:8000/api/interview/${sessionId}/response/${currentQuestionIndex}`,
+                    formData,
+                    { timeout: 30000 }
+                );
+            }
 
-            console.log('Analysis:', result.data);
-            setAnalysisData(result.data || {});
-            setPhase('results');
+            // Get analysis; results render progressively as each stage finishes
+            await streamAnalysis();
 
         } catch (err) {
             console.error("Analysis error:", err);
+            if (receivedAnalysisRef.current) {
+                // Keep the partial results that already streamed in
+                setError('Live analysis was interrupted; showing partial results');
+                return;
+            }
             setAnalysisData({
                 transcript: "Your response was recorded.",
                 voice_metrics: {
@@ -128,6 +203,7 @@ const InterviewSession = ({ sessionId, questions = [], onExit }) => {
                     onNext={handleNext}
                     isLastQuestion={currentQuestionIndex === questions.length - 1}
                     question={currentQuestion}
+                    isStreaming={isStreaming}
                 />
             </div>
         );
@@ -149,7 +225,24 @@ const InterviewSession = ({ sessionId, questions = [], onExit }) => {
                     🔊 Listen
                 </button>
 
-                <VideoRecorder onRecordingComplete={handleRecordingComplete} isProcessing={false} />
+                {captureProfile ? (
+                    <VideoRecorder
+                        key={currentQuestionIndex}
+                        onRecordingComplete={handleRecordingComplete}
+                        isProcessing={false}
+                        captureProfile={captureProfile}
+                        liveUrl={`ws://localhost:8000/api/interview/${sessionId}/response/${currentQuestionIndex}/live`}
+                    />
+                ) : profileFailed ? (
+                    <div style={{ color: '#92400e' }}>
+                        <p>Could not load the recording settings.</p>
+                        <button onClick={loadCaptureProfile} className="btn btn-secondary">
+                            ↻ Retry
+                        </button>
+                    </div>
+                ) : (
+                    <p style={{ color: '#6b7280' }}>Loading recording settings...</p>
+                )}
             </div>
         </div>
     );
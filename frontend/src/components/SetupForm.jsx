@@ -2,6 +2,16 @@
 import React, { useState } from 'react';
 import axios from 'axios';
 
+// Stable per-browser id so the backend can keep progress history across sessions
+const getCandidateId = () => {
+    let id = localStorage.getItem('candidateId');
+    if (!id) {
+        id = crypto.randomUUID();
+        localStorage.setItem('candidateId', id);
+    }
+    return id;
+};
+
 const SetupForm = ({ onComplete }) => {
     const [isLoading, setIsLoading] = useState(false);
     const [jobDescription, setJobDescription] = useState('');
@@ -19,6 +29,7 @@ const SetupForm = ({ onComplete }) => {
             const formData = new FormData();
             formData.append('job_description', jobDescription);
             formData.append('resume', resume);
+            formData.append('candidate_id', getCandidateId());
 
             const response = await axios.post('http://localhost:8000/api/interview/init', formData, {
                 headers: { 'Content-Type': 'multipart/form-data' },
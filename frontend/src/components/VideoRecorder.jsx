@@ -1,34 +1,105 @@
 
 import React, { useState, useRef } from 'react';
 
-const VideoRecorder = ({ onRecordingComplete, isProcessing }) => {
+// Maps the backend capture profile onto getUserMedia constraints and MediaRecorder options
+const mediaSettings = (profile) => {
+    if (!profile) {
+        return { constraints: { video: true, audio: true }, recorderOptions: {} };
+    }
+    const recorderOptions = {
+        videoBitsPerSecond: profile.video_bits_per_second,
+        audioBitsPerSecond: profile.audio_bits_per_second
+    };
+    // Otherwise the browser picks its own container; the blob is labelled with whatever it recorded
+    const mimeType = [profile.mime_type, ...(profile.fallback_mime_types || [])]
+        .find((type) => window.MediaRecorder && MediaRecorder.isTypeSupported(type));
+    if (mimeType) {
+        recorderOptions.mimeType = mimeType;
+    }
+    return {
+        constraints: {
+            video: {
+                width: { ideal: profile.width },
+                height: { ideal: profile.height },
+                frameRate: { ideal: profile.frame_rate, max: profile.frame_rate }
+            },
+            audio: { channelCount: 1, echoCancellation: true, noiseSuppression: true }
+        },
+        recorderOptions
+    };
+};
+
+// How long Submit waits for the live socket to finish transcribing the tail before uploading instead
+const LIVE_FINAL_TIMEOUT_MS = 20000;
+
+// The container the recorder actually produced, without codec parameters
+const recordedType = (recorder) => ((recorder && recorder.mimeType) || 'video/webm').split(';')[0];
+
+const VideoRecorder = ({ onRecordingComplete, isProcessing, liveUrl, captureProfile }) => {
     const [isRecording, setIsRecording] = useState(false);
     const [hasRecording, setHasRecording] = useState(false);
     const [recordingTime, setRecordingTime] = useState(0);
+    const [liveMetrics, setLiveMetrics] = useState(null);
+    const [isFinishing, setIsFinishing] = useState(false);
+    const socketRef = useRef(null);
+    // Resolves true once the server stored the streamed take, false if the socket failed
+    const liveFinalRef = useRef(null);
     const mediaRecorderRef = useRef(null);
     const videoRef = useRef(null);
     const chunksRef = useRef([]);
     const startTimeRef = useRef(null);
     const timerRef = useRef(null);
 
+    // Stream chunks to the backend while recording so transcription runs during the answer
+    const openLiveSocket = () => {
+        setLiveMetrics(null);
+        liveFinalRef.current = null;
+        if (!liveUrl) return;
+        try {
+            const socket = new WebSocket(liveUrl);
+            liveFinalRef.current = new Promise((resolve) => {
+                socket.onmessage = (event) => {
+                    const message = JSON.parse(event.data);
+                    setLiveMetrics(message.metrics);
+                    if (message.type === 'final') {
+                        resolve(true);
+                    }
+                };
+                socket.onerror = () => resolve(false);
+                socket.onclose = () => resolve(false);
+            });
+            socketRef.current = socket;
+        } catch (err) {
+            console.error("Live ingest unavailable:", err);
+            socketRef.current = null;
+            liveFinalRef.current = null;
+        }
+    };
+
     const startRecording = async () => {
         try {
             chunksRef.current = [];
-            const stream = await navigator.mediaDevices.getUserMedia({ video: true, audio: true });
+            openLiveSocket();
+            const { constraints, recorderOptions } = mediaSettings(captureProfile);
+            const stream = await navigator.mediaDevices.getUserMedia(constraints);
             videoRef.current.srcObject = stream;
             videoRef.current.muted = true;
 
-            const mediaRecorder = new MediaRecorder(stream);
+            const mediaRecorder = new MediaRecorder(stream, recorderOptions);
             mediaRecorderRef.current = mediaRecorder;
 
             mediaRecorder.ondataavailable = (event) => {
                 if (event.data.size > 0) {
                     chunksRef.current.push(event.data);
+                    const socket = socketRef.current;
+                    if (socket && socket.readyState === WebSocket.OPEN) {
+                        socket.send(event.data);
+                    }
                 }
             };
 
             mediaRecorder.onstop = () => {
-                const blob = new Blob(chunksRef.current, { type: 'video/webm' });
+                const blob = new Blob(chunksRef.current, { type: recordedType(mediaRecorder) });
                 const url = URL.createObjectURL(blob);
                 videoRef.current.srcObject = null;
                 videoRef.current.src = url;
@@ -36,14 +107,22 @@ const VideoRecorder = ({ onRecordingComplete, isProcessing }) => {
                 videoRef.current.controls = true;
                 setHasRecording(true);
 
+                const socket = socketRef.current;
+                if (socket && socket.readyState === WebSocket.OPEN) {
+                    socket.send(JSON.stringify({
+                        type: 'stop',
+                        duration_seconds: Math.floor((Date.now() - startTimeRef.current) / 1000)
+                    }));
+                }
+
                 // Stop timer
                 if (timerRef.current) {
                     clearInterval(timerRef.current);
                 }
             };
 
-            // Start recording
-            mediaRecorder.start();
+            // Start recording; a timeslice makes chunks available while still recording
+            mediaRecorder.start(liveUrl ? 1000 : undefined);
             startTimeRef.current = Date.now();
             setRecordingTime(0);
 
@@ -71,12 +150,23 @@ const VideoRecorder = ({ onRecordingComplete, isProcessing }) => {
         }
     };
 
-    const handleSubmit = () => {
-        if (chunksRef.current.length === 0) return;
-        const blob = new Blob(chunksRef.current, { type: 'video/webm' });
+    // The server sends 'final' only after transcribing the tail, so wait for it before
+    // deciding whether the answer still has to be uploaded
+    const waitForLiveFinal = () => {
+        if (!liveFinalRef.current) return Promise.resolve(false);
+        const timeout = new Promise((resolve) => setTimeout(() => resolve(false), LIVE_FINAL_TIMEOUT_MS));
+        return Promise.race([liveFinalRef.current, timeout]);
+    };
+
+    const handleSubmit = async () => {
+        if (chunksRef.current.length === 0 || isFinishing) return;
+        const blob = new Blob(chunksRef.current, { type: recordedType(mediaRecorderRef.current) });
         // Pass both the blob and the actual duration
         const actualDuration = recordingTime || Math.floor((Date.now() - startTimeRef.current) / 1000);
-        onRecordingComplete(blob, actualDuration);
+        setIsFinishing(true);
+        const streamed = await waitForLiveFinal();
+        setIsFinishing(false);
+        onRecordingComplete(blob, actualDuration, streamed);
     };
 
     const handleRetake = () => {
@@ -112,6 +202,21 @@ const VideoRecorder = ({ onRecordingComplete, isProcessing }) => {
                         }}>
                             {formatTime(recordingTime)}
                         </div>
+                        {liveMetrics && (
+                            <div style={{
+                                position: 'absolute',
+                                bottom: '1rem',
+                                left: '1rem',
+                                background: 'rgba(0,0,0,0.6)',
+                                color: 'white',
+                                padding: '0.25rem 0.75rem',
+                                borderRadius: '4px',
+                                fontSize: '0.875rem',
+                                fontFamily: 'monospace'
+                            }}>
+                                {liveMetrics.pace_wpm} WPM · {liveMetrics.total_fillers} fillers
+                            </div>
+                        )}
                     </>
                 )}
             </div>
@@ -131,11 +236,11 @@ const VideoRecorder = ({ onRecordingComplete, isProcessing }) => {
 
                 {hasRecording && !isRecording && (
                     <>
-                        <button onClick={handleRetake} className="btn btn-secondary">
+                        <button onClick={handleRetake} className="btn btn-secondary" disabled={isFinishing}>
                             🔄 Retake
                         </button>
-                        <button onClick={handleSubmit} className="btn btn-success" disabled={isProcessing}>
-                            {isProcessing ? 'Analyzing...' : `✓ Submit (${formatTime(recordingTime)})`}
+                        <button onClick={handleSubmit} className="btn btn-success" disabled={isProcessing || isFinishing}>
+                            {isProcessing ? 'Analyzing...' : isFinishing ? 'Finishing...' : `✓ Submit (${formatTime(recordingTime)})`}
                         </button>
                     </>
                 )}
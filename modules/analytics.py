@@ -0,0 +1,315 @@
+
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import Config
+from modules.voice_engine import FILLER_PHRASES
+
+# Vision labels worth trending; free-text descriptions are left out of the record
+VISION_LABELS = ("confidence_visual", "looking_away_frequency", "fidgeting", "interest_level")
+
+STOPWORDS = {
+    "the", "and", "that", "this", "with", "for", "was", "were", "are", "but", "not", "you", "your",
+    "have", "has", "had", "they", "them", "their", "there", "then", "than", "what", "when", "which",
+    "who", "how", "why", "from", "into", "out", "about", "just", "also", "very", "really", "some",
+    "all", "any", "can", "could", "would", "should", "will", "did", "does", "our", "its", "it's",
+    "i'm", "i've", "we", "so", "because", "been", "being", "more", "most", "one", "get", "got"
+}
+
+
+def answer_record(session_id: str, q_index: int, question: str, voice_result: dict,
+                  vision_result: dict, timestamp: float = None) -> dict:
+    """The compact per-answer record appended to the history log."""
+    metrics = voice_result.get("metrics", {})
+    vision_result = vision_result or {}
+    return {
+        "type": "answer",
+        "session_id": session_id,
+        "q_index": q_index,
+        "timestamp": timestamp or time.time(),
+        "question": question,
+        "transcript": voice_result.get("transcript", ""),
+        "wpm": metrics.get("pace_wpm", 0),
+        "words": metrics.get("word_count", 0),
+        "seconds": float(metrics.get("duration_seconds", 0) or 0),
+        "pauses": metrics.get("pause_count", 0),
+        "filler_words": dict(metrics.get("filler_words", {})),
+        "vision": {label: vision_result[label] for label in VISION_LABELS if vision_result.get(label)}
+    }
+
+
+def index_terms(transcript: str, filler_words: dict) -> dict:
+    """Filler phrases and content keywords of a transcript, with counts."""
+    terms = dict(filler_words)
+    single_fillers = {phrase for phrase in FILLER_PHRASES if " " not in phrase}
+    for word in re.findall(r"\b[\w']+\b", transcript.lower()):
+        if len(word) >= 3 and word not in STOPWORDS and word not in single_fillers:
+            terms[word] = terms.get(word, 0) + 1
+    return terms
+
+
+def new_bucket() -> dict:
+    return {
+        "answers": 0,
+        "words": 0,
+        "seconds": 0.0,
+        "fillers": 0,
+        "pauses": 0,
+        "wpm_sum": 0,
+        "score_sum": 0,
+        "scored": 0,
+        "filler_words": {},
+        "vision": {}
+    }
+
+
+def _apply(bucket: dict, contribution: dict, sign: int):
+    bucket["answers"] += sign
+    bucket["words"] += sign * contribution["words"]
+    bucket["seconds"] += sign * contribution["seconds"]
+    bucket["fillers"] += sign * sum(contribution["filler_words"].values())
+    bucket["pauses"] += sign * contribution["pauses"]
+    bucket["wpm_sum"] += sign * contribution["wpm"]
+    if contribution.get("score") is not None:
+        bucket["score_sum"] += sign * contribution["score"]
+        bucket["scored"] += sign
+    _add_counts(bucket["filler_words"], contribution["filler_words"], sign)
+    for label, value in contribution["vision"].items():
+        _add_counts(bucket["vision"].setdefault(label, {}), {value: 1}, sign)
+
+
+def _add_counts(counts: dict, delta: dict, sign: int):
+    for key, n in delta.items():
+        counts[key] = counts.get(key, 0) + sign * n
+        if counts[key] <= 0:
+            del counts[key]
+
+
+def summarize_bucket(bucket: dict) -> dict:
+    """Trend-ready stats for one rollup bucket."""
+    count = bucket["answers"]
+    minutes = bucket["seconds"] / 60.0
+    top_fillers = sorted(bucket["filler_words"].items(), key=lambda kv: -kv[1])[:3]
+    return {
+        "answers": count,
+        "mean_wpm": round(bucket["wpm_sum"] / count, 1) if count else 0,
+        "overall_wpm": round(bucket["words"] / minutes, 1) if minutes > 0 else 0,
+        "fillers_per_minute": round(bucket["fillers"] / minutes, 2) if minutes > 0 else 0,
+        "pauses_per_minute": round(bucket["pauses"] / minutes, 2) if minutes > 0 else 0,
+        "mean_content_score": round(bucket["score_sum"] / bucket["scored"], 1) if bucket["scored"] else None,
+        "top_fillers": dict(top_fillers),
+        "vision": {label: max(values, key=values.get) for label, values in bucket["vision"].items() if values}
+    }
+
+
+class AnalyticsStore:
+    """
+    Per-candidate history of analyzed answers under Config.ANALYTICS_DIR.
+
+    Each candidate has an append-only records.jsonl log and a state.json
+    snapshot. The snapshot holds running totals, day and session rollups and an
+    inverted index of filler phrases and keywords, all updated as records are
+    appended, so trend queries read buckets instead of answers. The snapshot is
+    written every Config.ANALYTICS_SNAPSHOT_EVERY records; on load, anything in
+    the log past the snapshot is replayed. At most max_loaded candidates are kept
+    in memory; the least recently used is snapshotted and dropped to make room.
+    """
+
+    def __init__(self, root=None, max_loaded=None):
+        self.root = root or Config.ANALYTICS_DIR
+        self.max_loaded = max_loaded or Config.ANALYTICS_MAX_LOADED
+        self.lock = threading.Lock()
+        # candidate_id -> state, least recently used first
+        self.states = OrderedDict()
+        os.makedirs(self.root, exist_ok=True)
+
+    def _dir(self, candidate_id):
+        return os.path.join(self.root, hashlib.sha256(candidate_id.encode("utf-8")).hexdigest()[:16])
+
+    def _new_state(self):
+        return {
+            "log_bytes": 0,
+            "unsaved": 0,
+            "totals": new_bucket(),
+            "days": {},
+            "sessions": {},
+            "session_order": [],
+            "answers": {},
+            "index": {}
+        }
+
+    def _state_locked(self, candidate_id):
+        state = self.states.get(candidate_id)
+        if state is not None:
+            self.states.move_to_end(candidate_id)
+            return state
+
+        directory = self._dir(candidate_id)
+        try:
+            with open(os.path.join(directory, "state.json")) as f:
+                state = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            state = self._new_state()
+
+        # Replay records written after the last snapshot
+        log_path = os.path.join(directory, "records.jsonl")
+        if os.path.exists(log_path) and os.path.getsize(log_path) > state["log_bytes"]:
+            with open(log_path, "r+b") as f:
+                f.seek(state["log_bytes"])
+                for line in iter(f.readline, b""):
+                    if not line.endswith(b"\n"):
+                        # Torn write from a crash: drop it so the next append starts on a fresh line
+                        f.truncate(state["log_bytes"])
+                        break
+                    self._fold(state, json.loads(line), state["log_bytes"])
+                    state["log_bytes"] += len(line)
+        state["unsaved"] = 0
+        self.states[candidate_id] = state
+        while len(self.states) > self.max_loaded:
+            evicted_id, evicted = self.states.popitem(last=False)
+            if evicted["unsaved"]:
+                self._snapshot_locked(evicted_id, evicted)
+        return state
+
+    def _fold(self, state, record, offset):
+        """Applies one log record to the totals, rollups and index."""
+        key = f"{record['session_id']}:{record['q_index']}"
+        previous = state["answers"].get(key)
+
+        if record["type"] == "content":
+            if previous is None:
+                return
+            contribution = dict(previous, score=record["score"])
+        else:
+            contribution = {
+                "session_id": record["session_id"],
+                "day": time.strftime("%Y-%m-%d", time.localtime(record["timestamp"])),
+                "offset": offset,
+                "words": record["words"],
+                "seconds": record["seconds"],
+                "pauses": record["pauses"],
+                "wpm": record["wpm"],
+                "filler_words": record["filler_words"],
+                "vision": record["vision"],
+                # A re-analysis keeps the content score until a new one arrives
+                "score": previous.get("score") if previous else None,
+                "terms": index_terms(record["transcript"], record["filler_words"])
+            }
+
+        # Re-analyzing an answer replaces its previous contribution everywhere
+        if previous is not None:
+            self._apply_everywhere(state, key, previous, -1)
+        state["answers"][key] = contribution
+        self._apply_everywhere(state, key, contribution, 1)
+
+    def _apply_everywhere(self, state, key, contribution, sign):
+        session_id = contribution["session_id"]
+        if session_id not in state["sessions"]:
+            state["sessions"][session_id] = new_bucket()
+            state["session_order"].append(session_id)
+        _apply(state["totals"], contribution, sign)
+        _apply(state["days"].setdefault(contribution["day"], new_bucket()), contribution, sign)
+        _apply(state["sessions"][session_id], contribution, sign)
+        for term, count in contribution["terms"].items():
+            postings = state["index"].setdefault(term, {})
+            if sign > 0:
+                postings[key] = count
+            else:
+                postings.pop(key, None)
+                if not postings:
+                    del state["index"][term]
+
+    def _append_locked(self, candidate_id, record):
+        state = self._state_locked(candidate_id)
+        directory = self._dir(candidate_id)
+        os.makedirs(directory, exist_ok=True)
+        line = (json.dumps(record) + "\n").encode("utf-8")
+        with open(os.path.join(directory, "records.jsonl"), "ab") as f:
+            f.write(line)
+        self._fold(state, record, state["log_bytes"])
+        state["log_bytes"] += len(line)
+
+        state["unsaved"] += 1
+        if state["unsaved"] >= Config.ANALYTICS_SNAPSHOT_EVERY:
+            self._snapshot_locked(candidate_id, state)
+
+    def _snapshot_locked(self, candidate_id, state):
+        state["unsaved"] = 0
+        path = os.path.join(self._dir(candidate_id), "state.json")
+        with open(path + ".tmp", "w") as f:
+            json.dump(state, f)
+        os.replace(path + ".tmp", path)
+
+    def record_answer(self, candidate_id: str, record: dict):
+        """Appends an answer_record() and folds it into the aggregates."""
+        with self.lock:
+            self._append_locked(candidate_id, record)
+
+    def record_content(self, candidate_id: str, session_id: str, q_index: int, content: dict):
+        """Attaches a content score to an answer that was already recorded."""
+        if not isinstance(content.get("score"), (int, float)):
+            return
+        with self.lock:
+            self._append_locked(candidate_id, {
+                "type": "content",
+                "session_id": session_id,
+                "q_index": q_index,
+                "timestamp": time.time(),
+                "score": content["score"]
+            })
+
+    def progress(self, candidate_id: str, last_sessions: int = 30) -> dict:
+        """Overall stats plus one summary per session, oldest first, for the last N sessions."""
+        with self.lock:
+            state = self._state_locked(candidate_id)
+            session_ids = state["session_order"][-last_sessions:]
+            return {
+                "overall": summarize_bucket(state["totals"]),
+                "sessions": [
+                    dict(summarize_bucket(state["sessions"][sid]), session_id=sid)
+                    for sid in session_ids if state["sessions"][sid]["answers"]
+                ]
+            }
+
+    def daily(self, candidate_id: str, days: int = 30) -> list:
+        """One summary per calendar day with answers, for the last N such days."""
+        with self.lock:
+            state = self._state_locked(candidate_id)
+            return [
+                dict(summarize_bucket(state["days"][day]), day=day)
+                for day in sorted(state["days"])[-days:]
+            ]
+
+    def search(self, candidate_id: str, term: str, limit: int = 20) -> list:
+        """Most recent answers whose transcript contains the filler phrase or keyword."""
+        with self.lock:
+            state = self._state_locked(candidate_id)
+            postings = state["index"].get(term.strip().lower(), {})
+            hits = sorted(postings, key=lambda key: -state["answers"][key]["offset"])[:limit]
+            offsets = [(key, state["answers"][key]["offset"], postings[key]) for key in hits]
+
+        results = []
+        if not offsets:
+            return results
+        with open(os.path.join(self._dir(candidate_id), "records.jsonl"), "rb") as f:
+            for key, offset, count in offsets:
+                f.seek(offset)
+                record = json.loads(f.readline())
+                record["matches"] = count
+                results.append(record)
+        return results
+
+    def flush(self):
+        """Writes every pending snapshot; call on shutdown."""
+        with self.lock:
+            for candidate_id, state in self.states.items():
+                if state["unsaved"]:
+                    self._snapshot_locked(candidate_id, state)
@@ -0,0 +1,122 @@
+
+import os
+import sys
+import tempfile
+import subprocess
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import Config
+from modules.prosody import (
+    SAMPLE_RATE, HOP_SECONDS, LONG_PAUSE_SECONDS, decode_pcm, frame_signal, frame_loudness_db, speech_mask
+)
+from modules.voice_engine import get_video_duration
+
+# Speech must last this long to count as the start or end of the answer (skips clicks and breaths)
+MIN_SPEECH_SECONDS = 0.2
+
+
+def find_speech_bounds(samples: np.ndarray, sample_rate: int = SAMPLE_RATE):
+    """Returns (start, end) in seconds of the first and last sustained speech, or None if there is none."""
+    frames = frame_signal(samples, sample_rate)
+    speech = speech_mask(frame_loudness_db(frames))
+    run = max(1, int(MIN_SPEECH_SECONDS / HOP_SECONDS))
+    # A frame starts a sustained run when the next `run` frames are all speech
+    sustained = np.flatnonzero(np.convolve(speech, np.ones(run), mode="valid") >= run)
+    if not len(sustained):
+        return None
+    return float(sustained[0] * HOP_SECONDS), float((sustained[-1] + run) * HOP_SECONDS)
+
+
+def speech_window(file_path: str):
+    """
+    The padded span of a recording that contains speech, decoded locally.
+    Returns None when there is no speech or cropping would save less than
+    Config.TRIM_MIN_SAVINGS_SECONDS.
+    """
+    samples = decode_pcm(file_path)
+    duration = len(samples) / SAMPLE_RATE
+    bounds = find_speech_bounds(samples)
+    if bounds is None:
+        return None
+
+    start = max(0.0, bounds[0] - Config.TRIM_PADDING_SECONDS)
+    end = min(duration, bounds[1] + Config.TRIM_PADDING_SECONDS)
+    if start + (duration - end) < Config.TRIM_MIN_SAVINGS_SECONDS:
+        return None
+    return {
+        "start": round(start, 2),
+        "end": round(end, 2),
+        "speech_start": round(bounds[0], 2),
+        "speech_end": round(bounds[1], 2),
+        "original_duration": round(duration, 2)
+    }
+
+
+def crop(src_path: str, window: dict, dst_path: str = None):
+    """
+    Stream-copies the window out of src_path (no re-encode). Returns the crop
+    record with the file's real offset into the original, or None if ffmpeg failed.
+    """
+    if dst_path is None:
+        fd, dst_path = tempfile.mkstemp(suffix=os.path.splitext(src_path)[1])
+        os.close(fd)
+    try:
+        result = subprocess.run(
+            ['ffmpeg', '-y', '-v', 'quiet', '-ss', f"{window['start']:.2f}", '-i', src_path,
+             '-t', f"{window['end'] - window['start']:.2f}", '-map', '0', '-c', 'copy',
+             '-avoid_negative_ts', 'make_zero', dst_path],
+            capture_output=True, timeout=60
+        )
+    except Exception as e:
+        print(f"[ERROR] Crop failed: {e}")
+        result = None
+    if result is None or result.returncode != 0 or not os.path.getsize(dst_path):
+        if os.path.exists(dst_path):
+            os.remove(dst_path)
+        return None
+
+    # Stream copy can only cut video on a keyframe, so the copy may start a little early
+    duration = get_video_duration(dst_path)
+    offset = min(window["start"], max(0.0, window["end"] - duration))
+    print(f"[INFO] Cropped {src_path} to {offset:.1f}s-{window['end']:.1f}s of {window['original_duration']:.1f}s")
+    return dict(window, path=dst_path, offset_seconds=round(offset, 2), duration_seconds=round(duration, 2))
+
+
+def crop_to_speech(src_path: str, dst_path: str = None):
+    """speech_window + crop for a single file. Returns the crop record, or None to analyze the original."""
+    try:
+        window = speech_window(src_path)
+    except Exception as e:
+        print(f"[WARN] Could not find speech window ({e}), analyzing the full recording")
+        return None
+    if window is None:
+        return None
+    return crop(src_path, window, dst_path)
+
+
+def restore_timing(voice_result: dict, record: dict, count_leading_pause: bool = True):
+    """
+    Maps metrics from a cropped file back onto the original recording: segment
+    times are shifted by the offset, duration and WPM use the full length, and
+    the cropped lead-in counts as the pause the model would have heard.
+    """
+    offset = record["offset_seconds"]
+    for segment in voice_result.get("segments", []):
+        segment["start"] = segment.get("start", 0) + offset
+        segment["end"] = segment.get("end", 0) + offset
+
+    metrics = voice_result.get("metrics")
+    if not metrics:
+        return
+    duration = record["original_duration"]
+    word_count = metrics.get("word_count", 0)
+    metrics["duration_seconds"] = round(duration, 1)
+    metrics["pace_wpm"] = int(round(word_count / (duration / 60.0))) if word_count > 0 else 0
+    # Only if the lead-in left in the cropped file is too short for the model to have counted it
+    lead_in_kept = record["speech_start"] - offset
+    if count_leading_pause and record["speech_start"] >= LONG_PAUSE_SECONDS and lead_in_kept < LONG_PAUSE_SECONDS:
+        metrics["pause_count"] = metrics.get("pause_count", 0) + 1
+    metrics["analysis_offset_seconds"] = offset
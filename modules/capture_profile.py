@@ -0,0 +1,64 @@
+
+import os
+import sys
+import json
+import subprocess
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import Config
+
+
+def capture_profile() -> dict:
+    """The recording settings the frontend should apply to getUserMedia and MediaRecorder."""
+    profile = dict(Config.CAPTURE_PROFILE)
+    profile["max_bytes_per_second"] = bytes_per_second()
+    return profile
+
+
+def bytes_per_second() -> int:
+    """Upper bound on upload size per recorded second, with headroom for container overhead."""
+    profile = Config.CAPTURE_PROFILE
+    bits = profile["video_bits_per_second"] + profile["audio_bits_per_second"]
+    return int(bits / 8 * Config.CAPTURE_SIZE_TOLERANCE)
+
+
+def check_upload(size_bytes: int, content_type: str, duration_seconds: float):
+    """Returns (status_code, detail) if an upload does not match the profile, else None."""
+    profile = Config.CAPTURE_PROFILE
+    containers = [t.split(";")[0] for t in [profile["mime_type"]] + profile.get("fallback_mime_types", [])]
+    if content_type and content_type.split(";")[0] not in containers:
+        return 415, f"Expected {' or '.join(containers)} upload, got {content_type}"
+
+    if duration_seconds and duration_seconds > profile["max_duration_seconds"]:
+        return 422, f"Recording longer than {profile['max_duration_seconds']}s"
+
+    # Short clips are dominated by headers, so allow a fixed slack on top of the rate
+    duration = duration_seconds or profile["max_duration_seconds"]
+    max_bytes = int(bytes_per_second() * duration) + Config.CAPTURE_SIZE_SLACK_BYTES
+    if size_bytes > max_bytes:
+        return 413, f"Upload is {size_bytes} bytes, capture profile allows {max_bytes} for {duration:.0f}s"
+    return None
+
+
+def check_dimensions(file_path: str):
+    """Returns (status_code, detail) if the video stream is larger than the profile, else None."""
+    profile = Config.CAPTURE_PROFILE
+    try:
+        result = subprocess.run(
+            ['ffprobe', '-v', 'quiet', '-select_streams', 'v:0', '-show_entries', 'stream=width,height',
+             '-of', 'json', file_path],
+            capture_output=True, text=True, timeout=10
+        )
+        streams = json.loads(result.stdout or "{}").get("streams", [])
+    except Exception:
+        # No ffprobe: the size check above is the only guard
+        return None
+
+    if not streams:
+        return None
+    width, height = streams[0].get("width", 0), streams[0].get("height", 0)
+    # Browsers treat the constraints as ideals and may round up, so allow one step of slack
+    if width > profile["width"] * 2 or height > profile["height"] * 2:
+        return 422, f"Video is {width}x{height}, capture profile is {profile['width']}x{profile['height']}"
+    return None
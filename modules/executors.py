@@ -0,0 +1,31 @@
+
+import os
+import sys
+import asyncio
+import functools
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import Config
+
+# Explicitly sized pools for work that cannot be made async. Keeping them separate
+# means a burst of slow SDK uploads can't starve file copies or local DSP, and none
+# of it runs on the event loop.
+IO_EXECUTOR = ThreadPoolExecutor(max_workers=Config.IO_WORKERS, thread_name_prefix="io")
+CPU_EXECUTOR = ThreadPoolExecutor(max_workers=Config.CPU_WORKERS, thread_name_prefix="cpu")
+MODEL_EXECUTOR = ThreadPoolExecutor(max_workers=Config.MODEL_SDK_WORKERS, thread_name_prefix="model")
+
+
+async def run_in(executor, fn, *args, **kwargs):
+    """Runs a blocking call on the given pool, carrying over contextvars like asyncio.to_thread."""
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(executor, functools.partial(context.run, fn, *args, **kwargs))
+
+
+def shutdown():
+    """Stops the process-wide pools; only call when the process is exiting."""
+    for executor in (IO_EXECUTOR, CPU_EXECUTOR, MODEL_EXECUTOR):
+        executor.shutdown(wait=False, cancel_futures=True)
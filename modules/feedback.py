@@ -1,8 +1,17 @@
 import os
+import sys
 import json
-import google.generativeai as genai
+import math
+import asyncio
 from dotenv import load_dotenv
-from voice_engine import process_file
+
+# Adds the parent directory to the system path so it can find the modules package
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.voice_engine import process_file
+from modules.model_scheduler import scheduler
+from modules.gemini_files import parse_json_response
+from config import Config
 
 # Load API keys
 load_dotenv()
@@ -70,7 +79,23 @@ def analyze_delivery(metrics: dict, tone: dict) -> dict:
         }
     }
 
-def analyze_content_with_gemini(transcript: str) -> dict:
+CONTENT_FIELDS = ("score", "star_method", "strengths", "weaknesses", "suggested_fix")
+
+# Per-item schema for batched scoring; mirrors the single-answer JSON format
+CONTENT_ITEM_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "id": {"type": "integer"},
+        "score": {"type": "integer"},
+        "star_method": {"type": "string", "enum": ["Yes", "Partial", "No"]},
+        "strengths": {"type": "array", "items": {"type": "string"}},
+        "weaknesses": {"type": "array", "items": {"type": "string"}},
+        "suggested_fix": {"type": "string"}
+    },
+    "required": ["id", *CONTENT_FIELDS]
+}
+
+def analyze_content_with_gemini(transcript: str, question: str = None) -> dict:
     """
     Evaluates WHAT the user said using Gemini 2.0.
     """
@@ -78,10 +103,13 @@ def analyze_content_with_gemini(transcript: str) -> dict:
     if not api_key:
         return {"error": "Missing GEMINI_API_KEY"}
 
+    import google.generativeai as genai
     genai.configure(api_key=api_key)
     model = genai.GenerativeModel("gemini-2.0-flash")
 
+    question_line = f'Interview question: "{question}"' if question else ""
     prompt = f"""
+    {question_line}
     Analyze this interview answer transcript: "{transcript}"
     
     Provide feedback in JSON format:
@@ -93,13 +121,259 @@ def analyze_content_with_gemini(transcript: str) -> dict:
     """
 
     try:
-        response = model.generate_content(prompt)
+        response = scheduler.run(model.generate_content, prompt)
         # Clean potential markdown formatting from AI response
-        clean_json = response.text.strip().removeprefix("```json").removesuffix("```").strip()
-        return json.loads(clean_json)
+        return parse_json_response(response.text)
     except Exception as e:
         return {"error": f"Gemini content analysis failed: {str(e)}"}
 
+def _valid_content(result) -> bool:
+    return (
+        isinstance(result, dict)
+        and all(field in result for field in CONTENT_FIELDS)
+        and isinstance(result["score"], int)
+        and isinstance(result["strengths"], list)
+        and isinstance(result["weaknesses"], list)
+    )
+
+def analyze_content_batch_with_gemini(items: list) -> list:
+    """
+    Scores several (question, transcript) pairs with one model request per
+    Config.CONTENT_BATCH_SIZE items, sharing the instructions and round trip.
+    Returns one result per item, in order, in the analyze_content_with_gemini
+    shape. Items missing from or malformed in the batch response are retried
+    with individual calls. If the request itself fails twice (rate limit,
+    outage), that batch's items get an error instead: calling once per item
+    would only multiply requests while the provider is failing.
+    """
+    if not items:
+        return []
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        return [{"error": "Missing GEMINI_API_KEY"} for _ in items]
+
+    import google.generativeai as genai
+    genai.configure(api_key=api_key)
+    model = genai.GenerativeModel("gemini-2.0-flash")
+    generation_config = genai.GenerationConfig(
+        response_mime_type="application/json",
+        response_schema={"type": "array", "items": CONTENT_ITEM_SCHEMA}
+    )
+
+    results = [None] * len(items)
+    batch_size = Config.CONTENT_BATCH_SIZE
+    for start in range(0, len(items), batch_size):
+        batch = items[start:start + batch_size]
+        answers = "\n\n".join(
+            f'ANSWER {i}\nQuestion: "{question}"\nTranscript: "{transcript}"'
+            for i, (question, transcript) in enumerate(batch)
+        )
+        prompt = f"""
+    Analyze each of the following interview answer transcripts independently.
+
+    {answers}
+
+    Return a JSON array with one object per answer, each with:
+    - id: (the ANSWER number)
+    - score: (integer 1-100)
+    - star_method: (Did they use Situation, Task, Action, Result? Answer "Yes", "Partial", or "No")
+    - strengths: (list of 2 strings)
+    - weaknesses: (list of 2 strings)
+    - suggested_fix: (one sentence on how to improve the answer)
+    """
+
+        response = None
+        for attempt in range(2):
+            try:
+                response = scheduler.run(model.generate_content, prompt, generation_config=generation_config)
+                break
+            except Exception as e:
+                print(f"[ERROR] Batch content analysis request failed (attempt {attempt + 1}): {e}")
+                error = {"error": f"Gemini content analysis failed: {str(e)}"}
+        if response is None:
+            for i in range(len(batch)):
+                results[start + i] = dict(error)
+            continue
+
+        try:
+            parsed = parse_json_response(response.text)
+        except Exception as e:
+            print(f"[ERROR] Batch content analysis response unreadable: {e}")
+            parsed = []
+
+        for entry in parsed if isinstance(parsed, list) else []:
+            item_id = entry.get("id") if isinstance(entry, dict) else None
+            if isinstance(item_id, int) and 0 <= item_id < len(batch) and _valid_content(entry):
+                results[start + item_id] = {field: entry[field] for field in CONTENT_FIELDS}
+
+    missing = [i for i, result in enumerate(results) if result is None]
+    if missing:
+        print(f"[WARN] {len(missing)} of {len(items)} batch items unparsed, scoring individually")
+    for i in missing:
+        question, transcript = items[i]
+        results[i] = analyze_content_with_gemini(transcript, question)
+    return results
+
+def summarize_delivery(voice_metrics: dict, vision_metrics: dict) -> str:
+    """One line per signal, for giving the model delivery context in a prompt."""
+    voice_metrics = voice_metrics or {}
+    vision_metrics = vision_metrics or {}
+    lines = [
+        f"- Pace: {voice_metrics.get('pace_wpm', 0)} WPM over {voice_metrics.get('duration_seconds', 0)}s",
+        f"- Filler words: {voice_metrics.get('total_fillers', 0)} {voice_metrics.get('filler_words', {})}",
+        f"- Long pauses: {voice_metrics.get('pause_count', 0)}"
+    ]
+    for key in ("eye_contact", "confidence_visual", "fidgeting", "interest_level"):
+        if vision_metrics.get(key):
+            lines.append(f"- {key.replace('_', ' ').capitalize()}: {vision_metrics[key]}")
+    return "\n".join(lines)
+
+
+def local_feedback(voice_metrics: dict, vision_metrics: dict) -> dict:
+    """Rule-based feedback in the FeedbackGenerator shape, for when the model can't answer in time."""
+    voice_metrics = voice_metrics or {}
+    vision_metrics = vision_metrics or {}
+    delivery = analyze_delivery(voice_metrics, {})
+    pace = voice_metrics.get("pace_wpm", 0)
+    minutes = max(float(voice_metrics.get("duration_seconds", 0) or 0), 1.0) / 60.0
+    fillers_per_minute = voice_metrics.get("total_fillers", 0) / minutes
+    pauses = voice_metrics.get("pause_count", 0)
+
+    score, strengths, improvements = 75, [], []
+    if 110 <= pace <= 170:
+        strengths.append("Your speaking pace was easy to follow.")
+    elif pace:
+        score -= 10
+        improvements.append(f"Aim for 110-170 WPM; you spoke at {pace}.")
+    if fillers_per_minute > 4:
+        score -= 10
+        improvements.append("Replace filler words with a short silent pause.")
+    elif fillers_per_minute <= 2:
+        strengths.append("You kept filler words to a minimum.")
+    if pauses > 3:
+        score -= 5
+        improvements.append("Plan your main points up front to avoid long hesitations.")
+    if vision_metrics.get("confidence_visual") == "high":
+        score += 5
+        strengths.append("You came across as confident on camera.")
+    elif vision_metrics.get("confidence_visual") == "low":
+        score -= 5
+        improvements.append("Keep your eyes on the camera and your posture steady.")
+    strengths = (strengths + ["You completed a full answer to the question."])[:2]
+    improvements = (improvements + ["Anchor the answer in one specific example with a measurable result."])[:2]
+
+    return {
+        "score": max(1, min(100, score)),
+        "strengths": strengths,
+        "improvements": improvements,
+        "content_feedback": f"{delivery['pacing']['feedback']} {delivery['fillers']['feedback']}",
+        "improved_answer_suggestion": "Structure the answer as Situation, Task, Action and Result.",
+        "follow_up_question": "Can you walk me through a specific example of that?",
+        "degraded": True
+    }
+
+class FeedbackGenerator:
+    """Feedback on one interview answer, in the shape AnalysisDashboard renders."""
+
+    def __init__(self, model_name: str = "gemini-2.0-flash"):
+        self.api_key = os.getenv("GEMINI_API_KEY")
+        self.model_name = model_name
+
+    def _model(self):
+        import google.generativeai as genai
+        genai.configure(api_key=self.api_key)
+        return genai.GenerativeModel(self.model_name)
+
+    def _score_prompt(self, transcript, voice_metrics, vision_metrics, question, with_prose):
+        prose_field = "- content_feedback: (2-3 sentences of overall coaching feedback)\n" if with_prose else ""
+        return f"""
+        Interview question: "{question}"
+        Candidate's answer transcript: "{transcript}"
+        Delivery signals:
+        {summarize_delivery(voice_metrics, vision_metrics)}
+
+        Provide feedback in JSON format:
+        - score: (integer 1-100, content and delivery combined)
+        - strengths: (list of 2 strings)
+        - improvements: (list of 2 strings)
+        {prose_field}- improved_answer_suggestion: (one sentence the candidate could have said instead)
+        - follow_up_question: (the question an interviewer would most likely ask next)
+        Return ONLY valid JSON.
+        """
+
+    def _stream_prompt(self, transcript, voice_metrics, vision_metrics, question):
+        return f"""
+        You are an interview coach. In 3-4 sentences of plain text (no markdown), tell the
+        candidate how their answer came across and the single most useful thing to change.
+
+        Interview question: "{question}"
+        Candidate's answer transcript: "{transcript}"
+        Delivery signals:
+        {summarize_delivery(voice_metrics, vision_metrics)}
+        """
+
+    async def score_answer_async(self, transcript: str, voice_metrics: dict, vision_metrics: dict,
+                                 question: str, with_prose: bool = True) -> dict:
+        """
+        Structured feedback: score, strengths, improvements, suggestion and follow-up.
+        with_prose=False leaves out content_feedback, for callers that stream it
+        separately. Hedged and bounded by the request deadline; falls back to
+        local_feedback.
+        """
+        from modules.hedging import hedger
+        return await hedger.run(
+            "feedback",
+            lambda: self._score_once_async(transcript, voice_metrics, vision_metrics, question, with_prose),
+            lambda: local_feedback(voice_metrics, vision_metrics)
+        )
+
+    async def _score_once_async(self, transcript, voice_metrics, vision_metrics, question, with_prose):
+        if not self.api_key:
+            return {"error": "Missing GEMINI_API_KEY"}
+
+        prompt = self._score_prompt(transcript, voice_metrics, vision_metrics, question, with_prose)
+        try:
+            async with scheduler.async_slot():
+                response = await self._model().generate_content_async(prompt)
+            return parse_json_response(response.text)
+        except Exception as e:
+            print(f"[ERROR] Feedback generation failed: {e}")
+            return {"error": f"Gemini feedback failed: {str(e)}"}
+
+    async def generate_feedback_async(self, transcript: str, voice_metrics: dict, vision_metrics: dict, question: str) -> dict:
+        return await self.score_answer_async(transcript, voice_metrics, vision_metrics, question, with_prose=True)
+
+    async def stream_feedback_async(self, transcript: str, voice_metrics: dict, vision_metrics: dict, question: str):
+        """
+        Yields the prose coaching feedback as text chunks while the model generates
+        it, holding the scheduler slot until the stream ends. Stops at the request deadline.
+        """
+        from modules.hedging import remaining
+        if not self.api_key:
+            return
+
+        def budget():
+            left = remaining()
+            return None if left == math.inf else max(0.0, left)
+
+        prompt = self._stream_prompt(transcript, voice_metrics, vision_metrics, question)
+        try:
+            async with scheduler.async_slot():
+                response = await asyncio.wait_for(
+                    self._model().generate_content_async(prompt, stream=True), budget()
+                )
+                chunks = response.__aiter__()
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), budget())
+                    except StopAsyncIteration:
+                        break
+                    if chunk.text:
+                        yield chunk.text
+        except asyncio.TimeoutError:
+            print("[WARN] Feedback stream cut off at the request deadline")
+
+
 if __name__ == "__main__":
     # Test execution
     test_path = "data/test_audio.wav"
@@ -0,0 +1,130 @@
+
+import os
+import sys
+import json
+import time
+import asyncio
+import functools
+import contextvars
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.model_scheduler import scheduler
+
+# Model asked about uploaded recordings by the voice and vision stages
+FILE_MODEL_NAME = "gemini-2.0-flash"
+
+
+def parse_json_response(text: str):
+    """Parses a JSON reply, tolerating a markdown code fence around it."""
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1].rsplit("```", 1)[0]
+    return json.loads(text)
+
+
+def wait_for_file_active(genai_file, timeout=60):
+    """Wait for uploaded file to become ACTIVE state."""
+    import google.generativeai as genai
+
+    start_time = time.time()
+    while time.time() - start_time < timeout:
+        file_status = genai.get_file(genai_file.name)
+        if file_status.state.name == "ACTIVE":
+            return True
+        elif file_status.state.name == "FAILED":
+            return False
+        print(f"[INFO] Waiting for file to be ready... ({file_status.state.name})")
+        time.sleep(2)
+    return False
+
+
+async def wait_for_file_active_async(genai_file, timeout=60):
+    """wait_for_file_active without blocking the event loop between polls."""
+    import google.generativeai as genai
+    from modules.executors import run_in, MODEL_EXECUTOR
+
+    start_time = time.time()
+    while time.time() - start_time < timeout:
+        file_status = await run_in(MODEL_EXECUTOR, genai.get_file, genai_file.name)
+        if file_status.state.name == "ACTIVE":
+            return True
+        elif file_status.state.name == "FAILED":
+            return False
+        print(f"[INFO] Waiting for file to be ready... ({file_status.state.name})")
+        await asyncio.sleep(2)
+    return False
+
+
+def delete_upload(genai_file):
+    """Removes an upload from the File API; failures only leave it to expire on its own."""
+    try:
+        genai_file.delete()
+    except Exception as e:
+        print(f"[WARN] Could not delete uploaded file {getattr(genai_file, 'name', '')}: {e}")
+
+
+def generate_from_file(api_key: str, file_path: str, prompt: str, priority=None) -> str:
+    """
+    Uploads file_path, asks the model prompt about it and returns the response
+    text. The upload is deleted afterwards whether or not the call succeeded.
+    Raises on failure.
+    """
+    import google.generativeai as genai
+    genai.configure(api_key=api_key)
+
+    uploaded_file = scheduler.run(genai.upload_file, file_path, priority=priority)
+    try:
+        if not wait_for_file_active(uploaded_file):
+            raise RuntimeError("File upload failed - file not ready")
+        model = genai.GenerativeModel(FILE_MODEL_NAME)
+        response = scheduler.run(model.generate_content, [prompt, uploaded_file], priority=priority)
+        return response.text
+    finally:
+        delete_upload(uploaded_file)
+
+
+async def generate_from_file_async(api_key: str, file_path: str, prompt: str, priority=None) -> str:
+    """
+    generate_from_file with the upload on the model executor and generation on
+    the async client. Cancelling the call (e.g. a losing hedge) cannot stop an
+    upload already running on the executor, so the upload is deleted by the
+    executor itself once it finishes; the delete is never awaited here.
+    """
+    import google.generativeai as genai
+    from modules.executors import MODEL_EXECUTOR
+    genai.configure(api_key=api_key)
+
+    async with scheduler.async_slot(priority=priority):
+        context = contextvars.copy_context()
+        upload = MODEL_EXECUTOR.submit(functools.partial(context.run, genai.upload_file, file_path))
+        try:
+            uploaded_file = await asyncio.wrap_future(upload)
+        except asyncio.CancelledError:
+            upload.add_done_callback(_delete_finished_upload)
+            raise
+    try:
+        if not await wait_for_file_active_async(uploaded_file):
+            raise RuntimeError("File upload failed - file not ready")
+        model = genai.GenerativeModel(FILE_MODEL_NAME)
+        async with scheduler.async_slot(priority=priority):
+            response = await model.generate_content_async([prompt, uploaded_file])
+        return response.text
+    finally:
+        _delete_in_background(uploaded_file)
+
+
+def _delete_in_background(genai_file):
+    """Queues delete_upload on the model executor without waiting for it."""
+    from modules.executors import MODEL_EXECUTOR
+    try:
+        MODEL_EXECUTOR.submit(delete_upload, genai_file)
+    except RuntimeError:
+        # Executor already shut down; the upload expires on its own
+        print(f"[WARN] Could not queue delete of uploaded file {getattr(genai_file, 'name', '')}")
+
+
+def _delete_finished_upload(upload):
+    """Done-callback for an upload whose caller was cancelled while it ran."""
+    if not upload.cancelled() and upload.exception() is None:
+        _delete_in_background(upload.result())
@@ -1,49 +1,147 @@
 
 import json
 import os
+import re
 import sys
+import zlib
 
 # Adds the parent directory to the system path so it can find config.py
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from config import Config
+from modules.model_scheduler import scheduler
+from modules.gemini_files import parse_json_response
 
-class QuestionGenerator:
-    def __init__(self):
+# Used when no question bank is available
+DEFAULT_QUESTIONS = [
+    "Tell me about yourself and your background in software development.",
+    "Can you describe a challenging project you worked on and how you overcame obstacles?",
+    "How do you approach learning new technologies?",
+    "Describe your experience with version control and team collaboration.",
+    "Where do you see yourself in 5 years?"
+]
+
+
+def extract_pdf_text(pdf_path: str) -> str:
+    """
+    Text of a resume PDF. Uses pypdf when installed; otherwise pulls the literal
+    strings out of the (possibly Flate-compressed) content streams, which covers
+    most resumes exported from word processors.
+    """
+    try:
+        from pypdf import PdfReader
+        return " ".join(page.extract_text() or "" for page in PdfReader(pdf_path).pages)
+    except ImportError:
         pass
+    except Exception as e:
+        print(f"[WARN] Could not read resume: {e}")
+        return ""
+
+    try:
+        with open(pdf_path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return ""
+    strings = []
+    for match in re.finditer(rb"stream\r?\n(.*?)\r?\nendstream", data, re.S):
+        content = match.group(1)
+        try:
+            content = zlib.decompress(content)
+        except zlib.error:
+            pass
+        # Text-showing operators take their strings as (literal) operands
+        strings += re.findall(rb"\(((?:[^()\\]|\\.)*)\)", content)
+    return b" ".join(strings).decode("latin-1", "ignore")
+
 
-    def generate_interview_questions(self, job_description, pdf_path):
+class QuestionGenerator:
+    def __init__(self, bank=None):
+        self._bank = bank
+
+    @property
+    def bank(self):
+        """The local question bank, loaded (and indexed on first run) on first use."""
+        if self._bank is None:
+            from modules.question_bank import QuestionBank
+            self._bank = QuestionBank()
+        return self._bank
+
+    def generate_interview_questions(self, job_description, pdf_path, enrich=None):
         """
-        Returns hardcoded mock questions to get the app running.
+        Picks questions from the local bank ranked against the job description
+        and resume, in milliseconds. With enrich (default Config.QUESTION_LLM_ENRICH)
+        Gemini then tailors the picked questions; if that fails the bank
+        questions are kept.
         """
-        print(f"Generating MOCK questions for: {job_description}")
-        
-        # MOCK DATA - This will always work
+        if enrich is None:
+            enrich = Config.QUESTION_LLM_ENRICH
+        resume_text = extract_pdf_text(pdf_path) if pdf_path and os.path.exists(pdf_path) else ""
+
+        try:
+            picks = self.bank.select(job_description, resume_text)
+            questions = [q["text"] for q in picks]
+            keywords = self.bank.matched_tags(picks, job_description, resume_text)
+            source = "bank"
+        except (OSError, ValueError) as e:
+            print(f"[WARN] Question bank unavailable ({e}), using default questions")
+            picks, questions, keywords, source = [], list(DEFAULT_QUESTIONS), [], "default"
+
+        if enrich and questions:
+            tailored = self.enrich_questions(job_description, resume_text, questions)
+            if tailored:
+                questions, source = tailored, "llm"
+
         questions_data = {
             "resume_info": {
-                "name": "Candidate",
-                "skills": ["Python", "JavaScript", "React"],
-                "experience_years": 2,
-                "keywords": ["full-stack", "web development", "API"]
+                "keywords": keywords
             },
-            "questions": [
-                "Tell me about yourself and your background in software development.",
-                "Can you describe a challenging project you worked on and how you overcame obstacles?",
-                "How do you approach learning new technologies?",
-                "Describe your experience with version control and team collaboration.",
-                "Where do you see yourself in 5 years?"
-            ]
+            "questions": questions,
+            "tags": [q["tags"] for q in picks] if source == "bank" else [],
+            "source": source
         }
-        
+
         # Save output
         os.makedirs(Config.DATA_DIR, exist_ok=True)
         output_path = os.path.join(Config.DATA_DIR, "questions.json")
         with open(output_path, "w") as f:
             json.dump(questions_data, f, indent=4)
-            
+
         return questions_data
 
+    def enrich_questions(self, job_description, resume_text, questions):
+        """Rewrites each question to reference the role and the candidate's background. None on failure."""
+        api_key = os.getenv("GEMINI_API_KEY") or Config.GEMINI_API_KEY
+        if not api_key:
+            return None
+
+        numbered = "\n".join(f"{i + 1}. {q}" for i, q in enumerate(questions))
+        prompt = f"""
+        Job description: "{job_description}"
+        Candidate resume (excerpt): "{resume_text[:3000]}"
+
+        Rewrite each of these interview questions so it refers to the role and
+        the candidate's background, keeping its intent and order:
+        {numbered}
+
+        Return ONLY a JSON array of {len(questions)} strings.
+        """
+        try:
+            import google.generativeai as genai
+            genai.configure(api_key=api_key)
+            model = genai.GenerativeModel("gemini-2.0-flash")
+            response = scheduler.run(model.generate_content, prompt)
+            tailored = parse_json_response(response.text)
+        except Exception as e:
+            print(f"[ERROR] Question enrichment failed: {e}")
+            return None
+
+        if not (isinstance(tailored, list) and len(tailored) == len(questions)
+                and all(isinstance(q, str) and q.strip() for q in tailored)):
+            print("[WARN] Enriched questions malformed, keeping bank questions")
+            return None
+        return [q.strip() for q in tailored]
+
 if __name__ == "__main__":
     generator = QuestionGenerator()
     res = generator.generate_interview_questions("Test", "test.pdf")
-    print(res)
\ No newline at end of file
+    print(res)
@@ -0,0 +1,183 @@
+
+import os
+import sys
+import math
+import time
+import asyncio
+import inspect
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import Config
+from modules.model_scheduler import scheduler, current_attempt
+
+# Absolute time.monotonic() by which the current request must have its answer.
+# Tasks copy it from their creator, so it follows work through gather/create_task.
+_deadline = contextvars.ContextVar("deadline", default=None)
+
+
+@contextmanager
+def deadline(seconds):
+    """Caps how long work inside the block may take. A nested deadline can only shorten the outer one."""
+    target = time.monotonic() + max(0.0, seconds)
+    current = _deadline.get()
+    if current is not None:
+        target = min(target, current)
+    token = _deadline.set(target)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> float:
+    """Seconds left before the current deadline; infinite when none is set."""
+    target = _deadline.get()
+    return math.inf if target is None else target - time.monotonic()
+
+
+def _is_error(result) -> bool:
+    return isinstance(result, dict) and "error" in result
+
+
+class Hedger:
+    """
+    Runs a model-backed stage with a hedged duplicate and a deadline.
+
+    Once a call has taken longer than the stage's recent p95 latency, one
+    duplicate is sent and whichever succeeds first wins; the other is cancelled.
+    Hedges are capped at Config.HEDGE_MAX_RATIO of all calls, so the extra cost
+    stays around the 5% of calls that land in the tail. Latency is timed from when
+    an attempt is granted its first model scheduler slot, and no hedge is sent while
+    calls are queued there: that slowness is local, and a duplicate would only
+    add to the queue. If no attempt succeeds
+    before the deadline, the stage's local fallback is returned instead.
+    """
+
+    def __init__(self, window=None, max_ratio=None):
+        self.window = window or Config.HEDGE_LATENCY_WINDOW
+        self.max_ratio = Config.HEDGE_MAX_RATIO if max_ratio is None else max_ratio
+        self.lock = threading.Lock()
+        self.latencies = {}
+        self.stats = {}
+        self.calls = 0
+        self.hedges = 0
+
+    def record(self, stage, seconds):
+        with self.lock:
+            self.latencies.setdefault(stage, deque(maxlen=self.window)).append(seconds)
+
+    def hedge_after(self, stage) -> float:
+        """The stage's p95 latency, or Config.HEDGE_DEFAULT_AFTER_SECONDS until enough calls were seen."""
+        with self.lock:
+            samples = sorted(self.latencies.get(stage, ()))
+        if len(samples) < Config.HEDGE_MIN_SAMPLES:
+            return Config.HEDGE_DEFAULT_AFTER_SECONDS
+        return samples[min(len(samples) - 1, int(0.95 * len(samples)))]
+
+    def _stage_stats(self, stage):
+        return self.stats.setdefault(stage, {"calls": 0, "hedged": 0, "hedge_wins": 0, "degraded": 0})
+
+    def _take_hedge(self, stage) -> bool:
+        with self.lock:
+            if self.hedges >= self.max_ratio * self.calls:
+                return False
+            self.hedges += 1
+            self._stage_stats(stage)["hedged"] += 1
+            return True
+
+    @staticmethod
+    def _start(make_call):
+        """Starts one attempt as a task; the scheduler fills in attempt["granted_at"]."""
+        attempt = {"started": time.monotonic(), "granted_at": None}
+        token = current_attempt.set(attempt)
+        try:
+            return asyncio.create_task(make_call()), attempt
+        finally:
+            current_attempt.reset(token)
+
+    async def run(self, stage, make_call, fallback, is_error=_is_error):
+        """
+        Awaits make_call() (a fresh coroutine per attempt), hedging and falling back
+        as described above. Results for which is_error() is true count as failures.
+        fallback() may return a value or an awaitable.
+        """
+        with self.lock:
+            self.calls += 1
+            stats = self._stage_stats(stage)
+            stats["calls"] += 1
+
+        hedge_after = self.hedge_after(stage)
+        tasks = {}
+        if remaining() > 0:
+            task, primary = self._start(make_call)
+            tasks[task] = ("primary", primary)
+        hedged = False
+
+        def hedge_at():
+            # Until the primary holds a slot and the queue is empty, check again later
+            if primary["granted_at"] is None or scheduler.queued():
+                return time.monotonic() + Config.HEDGE_BACKLOG_RECHECK_SECONDS
+            return primary["granted_at"] + hedge_after
+
+        try:
+            while tasks:
+                timeout = remaining()
+                if not hedged:
+                    timeout = min(timeout, max(0.0, hedge_at() - time.monotonic()))
+                if timeout <= 0 and hedged:
+                    break
+                done, _ = await asyncio.wait(
+                    tasks, timeout=None if timeout == math.inf else timeout,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    role, attempt = tasks.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        result = {"error": str(e)}
+                    if not is_error(result):
+                        self.record(stage, time.monotonic() - (attempt["granted_at"] or attempt["started"]))
+                        if role == "hedge":
+                            with self.lock:
+                                stats["hedge_wins"] += 1
+                        return result
+                    print(f"[WARN] {stage} {role} attempt failed: {result.get('error') if isinstance(result, dict) else result}")
+
+                if not done and not hedged:
+                    if remaining() > 0 and hedge_at() > time.monotonic():
+                        continue
+                    hedged = True
+                    if remaining() > 0 and self._take_hedge(stage):
+                        print(f"[INFO] {stage} slower than p95 ({time.monotonic() - primary['granted_at']:.1f}s), sending hedged request")
+                        task, attempt = self._start(make_call)
+                        tasks[task] = ("hedge", attempt)
+                elif not done:
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        with self.lock:
+            stats["degraded"] += 1
+        print(f"[WARN] {stage} missed its budget or failed, using local fallback")
+        result = fallback()
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    def metrics(self) -> dict:
+        with self.lock:
+            stages = {stage: dict(stats) for stage, stats in self.stats.items()}
+        for stage, stats in stages.items():
+            stats["hedge_after_seconds"] = round(self.hedge_after(stage), 2)
+        return {"calls": self.calls, "hedges": self.hedges, "stages": stages}
+
+
+# Shared by every module in the process
+hedger = Hedger()
@@ -0,0 +1,146 @@
+
+import os
+import re
+import sys
+import time
+import subprocess
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import Config
+from modules.voice_engine import transcribe_with_gemini, extract_metrics
+from modules.prosody import speech_frame_times, LONG_PAUSE_SECONDS
+
+
+def extract_audio_window(src_path: str, start_seconds: float, dst_path: str) -> bool:
+    """Decode audio from start_seconds to the end of src_path into a mono 16kHz wav."""
+    try:
+        result = subprocess.run(
+            ['ffmpeg', '-y', '-v', 'quiet', '-ss', f"{start_seconds:.2f}", '-i', src_path,
+             '-vn', '-ac', '1', '-ar', '16000', dst_path],
+            capture_output=True, timeout=30
+        )
+        return os.path.exists(dst_path) and os.path.getsize(dst_path) > 44
+    except Exception as e:
+        print(f"[ERROR] Audio window extraction failed: {e}")
+        return False
+
+
+def _normalize(word: str) -> str:
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+def stitch(words: list, new_words: list, max_overlap: int = 12) -> list:
+    """
+    Appends the words of an overlapping window to the transcript so far, dropping
+    the run both windows heard. The last word before the seam and the first word
+    after it may be clipped, so the match may skip one of each.
+    """
+    if not words:
+        return list(new_words)
+    old = [_normalize(w) for w in words[-(max_overlap + 1):]]
+    new = [_normalize(w) for w in new_words[:max_overlap + 1]]
+    for length in range(min(max_overlap, len(old), len(new)), 0, -1):
+        for drop in (0, 1):
+            for skip in (0, 1):
+                end = len(old) - drop
+                if end - length >= 0 and skip + length <= len(new) and old[end - length:end] == new[skip:skip + length]:
+                    return words[:len(words) - drop] + new_words[skip + length:]
+    return words + new_words
+
+
+class LiveTranscriber:
+    """
+    Accumulates MediaRecorder chunks into the response file and transcribes
+    the recording in rolling windows while the candidate is still speaking.
+    Windows overlap by Config.LIVE_WINDOW_OVERLAP_SECONDS and are stitched on
+    the words they share, so a word spoken across a cut is kept once. Pauses are
+    found locally from each window's speech frames and only counted when they end
+    in the new audio, so one at a cut is counted once too.
+    """
+
+    def __init__(self, video_path: str, window_seconds: float = None, overlap_seconds: float = None):
+        self.video_path = video_path
+        self.window_seconds = window_seconds or Config.LIVE_WINDOW_SECONDS
+        self.overlap_seconds = Config.LIVE_WINDOW_OVERLAP_SECONDS if overlap_seconds is None else overlap_seconds
+        self.started_at = None
+        self.transcribed_until = 0.0
+        self.words = []
+        self.pause_count = 0
+        # Absolute time of the last speech frame seen, so a pause spanning a cut is still found
+        self.last_speech_at = None
+        self.bytes_received = 0
+
+        # Each take streams into its own file, starting empty
+        with open(self.video_path, "wb"):
+            pass
+
+    def append_chunk(self, data: bytes):
+        if self.started_at is None:
+            self.started_at = time.time()
+        with open(self.video_path, "ab") as f:
+            f.write(data)
+        self.bytes_received += len(data)
+
+    def elapsed(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return time.time() - self.started_at
+
+    def window_due(self) -> bool:
+        return self.elapsed() - self.transcribed_until >= self.window_seconds
+
+    def transcribe_pending(self, until: float = None) -> dict:
+        """
+        Transcribe everything recorded since the last window and return
+        interim metrics for the transcript so far. Blocking; run it off the
+        event loop.
+        """
+        until = self.elapsed() if until is None else until
+        if until - self.transcribed_until < 0.5:
+            return self.metrics(until)
+        start = max(0.0, self.transcribed_until - self.overlap_seconds)
+
+        window_path = f"{self.video_path}.win{int(start * 1000)}.wav"
+        try:
+            if extract_audio_window(self.video_path, start, window_path):
+                stt_result = transcribe_with_gemini(window_path)
+                self.words = stitch(self.words, stt_result.get("text", "").split())
+                self.count_pauses(window_path, start)
+            self.transcribed_until = until
+        finally:
+            if os.path.exists(window_path):
+                os.remove(window_path)
+
+        return self.metrics(until)
+
+    def count_pauses(self, window_path: str, start: float):
+        """
+        Adds the long pauses that end past transcribed_until. The model's own
+        pause count can't be used here: it has no timestamps, so a pause in the
+        overlap would be counted by both windows.
+        """
+        try:
+            times = start + speech_frame_times(window_path)
+        except Exception as e:
+            print(f"[WARN] Could not count pauses in live window: {e}")
+            return
+        if self.last_speech_at is not None:
+            times = np.concatenate(([self.last_speech_at], times[times > self.last_speech_at]))
+        if len(times) > 1:
+            long_gap = np.diff(times) >= LONG_PAUSE_SECONDS
+            self.pause_count += int(np.count_nonzero(long_gap & (times[1:] > self.transcribed_until)))
+        if len(times):
+            self.last_speech_at = float(times[-1])
+
+    @property
+    def transcript(self) -> str:
+        return " ".join(self.words)
+
+    def metrics(self, duration: float = None) -> dict:
+        duration = self.elapsed() if duration is None else duration
+        metrics = extract_metrics(self.transcript, duration_seconds=duration)
+        metrics["pause_count"] = self.pause_count
+        return metrics
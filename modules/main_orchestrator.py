@@ -3,6 +3,7 @@ import os
 import cv2
 import sys
 import json
+from concurrent.futures import ThreadPoolExecutor
 
 # Adds the parent directory to the system path so it can find config.py
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -10,8 +11,16 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from modules.gen_questions import QuestionGenerator
 from modules.text_to_speech import TextToSpeech
 from modules.get_recording import InterviewRecorder
+from modules.voice_engine import process_file
+from modules.vision_processor import VisionProcessor
+from modules.feedback import analyze_delivery, analyze_content_batch_with_gemini
+from modules.storage import StorageManager
+from modules import answer_window
 from config import Config
 
+# Answers are analyzed in the background while the next question plays
+ANALYSIS_WORKERS = 2
+
 def load_questions():
     """Loads questions from the local JSON file."""
     path = os.path.join(Config.DATA_DIR, "questions.json")
@@ -31,11 +40,79 @@ def run_countdown(seconds):
         time.sleep(1)
     print("\n🎬 RECORDING STARTED! (Press 'q' to finish early)\n")
 
+def analyze_answer(vision, audio_path, video_path):
+    """Runs the voice and vision stages for one recorded answer, cropped to where the candidate speaks."""
+    # The speech window comes from the audio track and is applied to both recordings
+    try:
+        window = answer_window.speech_window(audio_path)
+    except Exception as e:
+        print(f"[WARN] Could not find speech window ({e}), analyzing the full recording")
+        window = None
+    audio_crop = answer_window.crop(audio_path, window) if window else None
+    video_crop = answer_window.crop(video_path, window) if window else None
+
+    voice_result = process_file(audio_crop["path"] if audio_crop else audio_path)
+    if audio_crop:
+        answer_window.restore_timing(voice_result, audio_crop)
+    vision_result = vision.analyze_video(video_crop["path"] if video_crop else video_path)
+
+    # The originals stay in the store; the crops were only needed for the upload
+    for record in (audio_crop, video_crop):
+        if record:
+            os.remove(record["path"])
+    return {
+        "voice": voice_result,
+        "vision": vision_result,
+        "delivery": analyze_delivery(voice_result.get("metrics", {}), voice_result.get("analysis", {}))
+    }
+
+def print_report(questions, results):
+    """Prints the full interview report once every answer has been analyzed."""
+    # Score every answer's content in one batched request instead of one call each
+    scored = [i for i in sorted(results) if "error" not in results[i]["voice"]]
+    contents = analyze_content_batch_with_gemini(
+        [(questions[i], results[i]["voice"].get("transcript", "")) for i in scored]
+    )
+    for i, content in zip(scored, contents):
+        results[i]["content"] = content
+
+    print("\n========== 📋 Interview Report ==========")
+    for i, question in enumerate(questions):
+        result = results.get(i)
+        print(f"\n--- Question {i+1}: {question}")
+        if result is None:
+            print("   (not recorded)")
+            continue
+        voice = result["voice"]
+        if "error" in voice:
+            print(f"   ❌ Voice analysis failed: {voice['error']}")
+        else:
+            delivery = result["delivery"]
+            print(f"   Transcript: {voice.get('transcript', '')}")
+            print(f"   Pace: {delivery['pacing']['wpm']} WPM - {delivery['pacing']['feedback']}")
+            print(f"   Fillers: {delivery['fillers']['total_count']} - {delivery['fillers']['feedback']}")
+            print(f"   Pauses: {voice.get('metrics', {}).get('pause_count', 0)}")
+            content = result.get("content", {})
+            if "error" not in content:
+                print(f"   Content score: {content.get('score')}/100 (STAR: {content.get('star_method')})")
+                print(f"   Suggested fix: {content.get('suggested_fix')}")
+        vision_result = result["vision"]
+        if "error" in vision_result:
+            print(f"   ❌ Vision analysis failed: {vision_result['error']}")
+        else:
+            print(f"   Eye contact: {vision_result.get('eye_contact')}")
+            print(f"   Impression: {vision_result.get('overall_impression')}")
+
 def start_interview():
+    Config.ensure_dirs()
+
     # Initialize components
     q_gen = QuestionGenerator()
     tts = TextToSpeech()
     recorder = InterviewRecorder()
+    vision = VisionProcessor()
+    storage = StorageManager()
+    storage.sweep()  # The CLI is short-lived, so clean up old recordings once at startup
 
     # 1. Inputs: Resume and Job Description
     print("--- 🤖 AI Interview Coach: Setup ---")
@@ -54,17 +131,24 @@ def start_interview():
 
     print(f"✅ Generated {len(questions)} questions. Let's begin!\n")
 
+    # Synthesize every question up front; question i only waits on its own audio
+    tts_pool = ThreadPoolExecutor(max_workers=len(questions))
+    audio_futures = [tts_pool.submit(tts.generate_audio, question, i) for i, question in enumerate(questions)]
+    analysis_pool = ThreadPoolExecutor(max_workers=ANALYSIS_WORKERS)
+    analysis_futures = {}
+
     # 3. Main Loop
     for i, question in enumerate(questions):
         print(f"--- Question {i+1} ---")
         print(f"Question: {question}")
         
         # A. Speaking and Displaying the Question
-        # speak_question handles the TTS and returns the path to the .wav
-        audio_file = tts.generate_audio(question, i)
+        # The audio was prefetched; this returns immediately unless synthesis is still running
+        audio_file = audio_futures[i].result()
         
         # B. Wait for TTS to finish (or use a non-blocking play if preferred)
-        tts.play_audio(audio_file)
+        if audio_file:
+            tts.play_audio(audio_file)
         
         # C. 10-second Preparation Countdown
         run_countdown(10)
@@ -75,11 +159,26 @@ def start_interview():
         
         # record handles both streams via threading
         recorder.record_interview_part(video_output, audio_output, duration=5)
+        video_output = storage.put_file(video_output, "recording")
+        audio_output = storage.put_file(audio_output, "recording")
         
-        print(f"✅ Answer {i+1} recorded and saved.\n")
+        print(f"✅ Answer {i+1} recorded and saved. Analyzing in the background...\n")
+        analysis_futures[i] = analysis_pool.submit(analyze_answer, vision, audio_output, video_output)
         time.sleep(2) # Brief pause before the next question
 
-    print("🎉 Interview Complete! All recordings are stored in the data folder.")
+    print("🎉 Interview Complete! All recordings are stored in the data/store folder.")
+    print("⏳ Waiting for the remaining analyses to finish...")
+
+    results = {}
+    for i, future in analysis_futures.items():
+        try:
+            results[i] = future.result()
+        except Exception as e:
+            print(f"❌ Analysis of answer {i+1} failed: {e}")
+    tts_pool.shutdown(wait=False)
+    analysis_pool.shutdown()
+
+    print_report(questions, results)
 
 if __name__ == "__main__":
     start_interview()
\ No newline at end of file
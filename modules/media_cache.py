@@ -0,0 +1,58 @@
+
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import Config
+
+
+class BytesLRU:
+    """
+    Bounded in-memory cache of file contents for hot media clips.
+    Files larger than max_item_bytes are read from disk every time.
+    """
+
+    def __init__(self, max_bytes=None, max_item_bytes=None):
+        self.max_bytes = max_bytes if max_bytes is not None else Config.MEDIA_CACHE_MAX_BYTES
+        self.max_item_bytes = max_item_bytes if max_item_bytes is not None else Config.MEDIA_CACHE_MAX_ITEM_BYTES
+        self.items = OrderedDict()
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+
+    def cached(self, path: str):
+        """Returns the file's bytes if they are in memory, else None. Never touches the disk."""
+        with self.lock:
+            data = self.items.get(path)
+            if data is not None:
+                self.items.move_to_end(path)
+            return data
+
+    def get(self, path: str) -> bytes:
+        """Returns the file's bytes, from memory when possible."""
+        with self.lock:
+            data = self.items.get(path)
+            if data is not None:
+                self.items.move_to_end(path)
+                return data
+
+        with open(path, "rb") as f:
+            data = f.read()
+
+        if len(data) <= self.max_item_bytes:
+            with self.lock:
+                if path not in self.items:
+                    self.items[path] = data
+                    self.total_bytes += len(data)
+                while self.total_bytes > self.max_bytes and self.items:
+                    _, evicted = self.items.popitem(last=False)
+                    self.total_bytes -= len(evicted)
+        return data
+
+    def discard(self, path: str):
+        with self.lock:
+            data = self.items.pop(path, None)
+            if data is not None:
+                self.total_bytes -= len(data)
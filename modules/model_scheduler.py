@@ -0,0 +1,202 @@
+
+import os
+import sys
+import time
+import asyncio
+import threading
+import contextvars
+from collections import OrderedDict, deque
+from contextlib import contextmanager, asynccontextmanager
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import Config
+
+# Priority classes, most urgent first
+INTERACTIVE = 0  # the user is waiting on this call right now (e.g. next question's audio)
+NORMAL = 1       # user-triggered work with a spinner (transcription, feedback)
+BULK = 2         # delay-tolerant work (vision, tone, report re-scoring)
+
+PRIORITY_NAMES = {INTERACTIVE: "interactive", NORMAL: "normal", BULK: "bulk"}
+
+# Set by request handlers so calls deep inside the modules are attributed correctly.
+# executors.run_in copies these into the worker thread with contextvars.copy_context(),
+# so any offload that bypasses run_in must do the same or lose the attribution.
+_current_session = contextvars.ContextVar("model_session", default=None)
+_current_priority = contextvars.ContextVar("model_priority", default=NORMAL)
+# Set by the hedger around each attempt it starts ({"granted_at": None}); the first
+# slot granted inside the attempt records when, so queueing isn't timed as latency.
+current_attempt = contextvars.ContextVar("model_attempt", default=None)
+
+
+def _mark_granted():
+    attempt = current_attempt.get()
+    if attempt is not None and attempt["granted_at"] is None:
+        attempt["granted_at"] = time.monotonic()
+
+
+@contextmanager
+def call_context(session_id=None, priority=None):
+    """Attributes model calls made inside the block to a session and priority class."""
+    session_token = _current_session.set(session_id)
+    priority_token = _current_priority.set(NORMAL if priority is None else priority)
+    try:
+        yield
+    finally:
+        _current_session.reset(session_token)
+        _current_priority.reset(priority_token)
+
+
+class ModelScheduler:
+    """
+    Gate for every outbound model call.
+
+    At most max_concurrency calls run at once. Waiting calls are granted by strict
+    priority, and within a priority class sessions take turns round-robin, so one
+    session's batch cannot starve another session's calls.
+    """
+
+    def __init__(self, max_concurrency=None):
+        self.max_concurrency = max_concurrency or Config.MODEL_MAX_CONCURRENCY
+        self.cond = threading.Condition()
+        # priority -> OrderedDict(session_id -> deque of waiting tickets)
+        self.queues = {p: OrderedDict() for p in PRIORITY_NAMES}
+        self.in_flight = 0
+        self.stats = {p: {"granted": 0, "wait_total": 0.0, "wait_max": 0.0} for p in PRIORITY_NAMES}
+
+    def run(self, fn, *args, priority=None, session_id=None, **kwargs):
+        """Calls fn(*args, **kwargs) once a slot is granted, in the caller's thread."""
+        if priority is None:
+            priority = _current_priority.get()
+        if session_id is None:
+            session_id = _current_session.get()
+
+        self._acquire(priority, session_id)
+        _mark_granted()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self._release()
+
+    @asynccontextmanager
+    async def async_slot(self, priority=None, session_id=None):
+        """
+        Holds a slot for the duration of the block, e.g. while consuming a streamed
+        response. Waits for the grant without blocking the event loop.
+        """
+        if priority is None:
+            priority = _current_priority.get()
+        if session_id is None:
+            session_id = _current_session.get()
+
+        loop = asyncio.get_running_loop()
+        ticket = {"granted": False, "future": loop.create_future(), "loop": loop}
+        enqueued_at = time.time()
+        with self.cond:
+            self.queues[priority].setdefault(session_id, deque()).append(ticket)
+            self._dispatch_locked()
+        try:
+            await ticket["future"]
+        except asyncio.CancelledError:
+            with self.cond:
+                if ticket["granted"]:
+                    self.in_flight -= 1
+                    self._dispatch_locked()
+                else:
+                    tickets = self.queues[priority].get(session_id)
+                    if tickets is not None and ticket in tickets:
+                        tickets.remove(ticket)
+                        if not tickets:
+                            del self.queues[priority][session_id]
+            raise
+
+        with self.cond:
+            self._record_wait_locked(priority, enqueued_at)
+        _mark_granted()
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _acquire(self, priority, session_id):
+        ticket = {"granted": False}
+        enqueued_at = time.time()
+        with self.cond:
+            self.queues[priority].setdefault(session_id, deque()).append(ticket)
+            self._dispatch_locked()
+            while not ticket["granted"]:
+                self.cond.wait()
+            self._record_wait_locked(priority, enqueued_at)
+
+    def _record_wait_locked(self, priority, enqueued_at):
+        waited = time.time() - enqueued_at
+        stats = self.stats[priority]
+        stats["granted"] += 1
+        stats["wait_total"] += waited
+        stats["wait_max"] = max(stats["wait_max"], waited)
+
+    def _release(self):
+        with self.cond:
+            self.in_flight -= 1
+            self._dispatch_locked()
+
+    def _dispatch_locked(self):
+        granted = False
+        while self.in_flight < self.max_concurrency:
+            ticket = self._next_ticket_locked()
+            if ticket is None:
+                break
+            ticket["granted"] = True
+            self.in_flight += 1
+            granted = True
+            if "future" in ticket:
+                ticket["loop"].call_soon_threadsafe(_resolve, ticket["future"])
+        if granted:
+            self.cond.notify_all()
+
+    def _next_ticket_locked(self):
+        for priority in sorted(self.queues):
+            sessions = self.queues[priority]
+            if not sessions:
+                continue
+            session_id, tickets = next(iter(sessions.items()))
+            ticket = tickets.popleft()
+            # Rotate so the next grant in this class goes to a different session
+            if tickets:
+                sessions.move_to_end(session_id)
+            else:
+                del sessions[session_id]
+            return ticket
+        return None
+
+    def queued(self) -> int:
+        """Calls waiting for a slot, across every priority class."""
+        with self.cond:
+            return sum(len(t) for sessions in self.queues.values() for t in sessions.values())
+
+    def metrics(self) -> dict:
+        with self.cond:
+            classes = {}
+            for priority, name in PRIORITY_NAMES.items():
+                stats = self.stats[priority]
+                classes[name] = {
+                    "queue_depth": sum(len(t) for t in self.queues[priority].values()),
+                    "waiting_sessions": len(self.queues[priority]),
+                    "granted": stats["granted"],
+                    "avg_wait_seconds": round(stats["wait_total"] / stats["granted"], 3) if stats["granted"] else 0,
+                    "max_wait_seconds": round(stats["wait_max"], 3)
+                }
+            return {
+                "in_flight": self.in_flight,
+                "max_concurrency": self.max_concurrency,
+                "classes": classes
+            }
+
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(None)
+
+
+# Shared by every module in the process
+scheduler = ModelScheduler()
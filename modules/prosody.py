@@ -0,0 +1,232 @@
+
+import os
+import sys
+import subprocess
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+SAMPLE_RATE = 16000
+FRAME_SECONDS = 0.04   # long enough to hold two periods of a 50 Hz voice
+HOP_SECONDS = 0.01
+MIN_F0 = 60.0
+MAX_F0 = 400.0
+# Same threshold the transcription prompt uses for a "significant pause"
+LONG_PAUSE_SECONDS = 2.0
+# Average English syllables per word, for turning syllable nuclei into a word estimate
+SYLLABLES_PER_WORD = 1.5
+# Frames transformed at once; bounds memory to a few MB per call whatever the clip length
+BLOCK_FRAMES = 1000
+
+
+def decode_pcm(file_path: str, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Decodes the audio track of any ffmpeg-readable file to mono float32 in [-1, 1]."""
+    result = subprocess.run(
+        ['ffmpeg', '-v', 'quiet', '-i', file_path, '-vn', '-ac', '1', '-ar', str(sample_rate),
+         '-f', 's16le', '-'],
+        capture_output=True, timeout=60
+    )
+    if result.returncode != 0 or not result.stdout:
+        raise RuntimeError(f"Could not decode audio from {file_path}")
+    return np.frombuffer(result.stdout, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def frame_signal(samples: np.ndarray, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Splits samples into overlapping frames, shape (n_frames, frame_len). No copy."""
+    frame_len = int(FRAME_SECONDS * sample_rate)
+    hop = int(HOP_SECONDS * sample_rate)
+    if len(samples) < frame_len:
+        samples = np.pad(samples, (0, frame_len - len(samples)))
+    return np.lib.stride_tricks.sliding_window_view(samples, frame_len)[::hop]
+
+
+def frame_loudness_db(frames: np.ndarray) -> np.ndarray:
+    """RMS level of each frame in dBFS, computed BLOCK_FRAMES at a time."""
+    rms_db = np.empty(len(frames), dtype=np.float32)
+    for start in range(0, len(frames), BLOCK_FRAMES):
+        block = frames[start:start + BLOCK_FRAMES]
+        rms_db[start:start + len(block)] = 20 * np.log10(np.sqrt(np.einsum("ij,ij->i", block, block) / block.shape[1] + 1e-12))
+    return rms_db
+
+
+def speech_mask(rms_db: np.ndarray) -> np.ndarray:
+    """Frames well above the recording's noise floor count as speech."""
+    noise_floor = np.percentile(rms_db, 10)
+    return rms_db > max(noise_floor + 12, -50)
+
+
+def _spectral_tracks(frames: np.ndarray, sample_rate: int):
+    """
+    Per-frame pitch, pitch strength and spectral flatness. Frames are windowed and
+    transformed BLOCK_FRAMES at a time in float32, so only the small per-frame
+    results grow with the length of the recording.
+    """
+    frame_len = frames.shape[1]
+    window = np.hanning(frame_len).astype(np.float32)
+    n_fft = 1 << (2 * frame_len - 1).bit_length()
+    min_lag = int(sample_rate / MAX_F0)
+    max_lag = int(sample_rate / MIN_F0)
+
+    f0 = np.empty(len(frames), dtype=np.float32)
+    strength = np.empty(len(frames), dtype=np.float32)
+    flatness = np.empty(len(frames), dtype=np.float32)
+    for start in range(0, len(frames), BLOCK_FRAMES):
+        windowed = frames[start:start + BLOCK_FRAMES] * window
+        stop = start + len(windowed)
+        spectrum = np.abs(np.fft.rfft(windowed, n=n_fft, axis=1)).astype(np.float32) ** 2
+
+        # Pitch: autocorrelation via the power spectrum, strongest lag in the F0 range
+        autocorr = np.fft.irfft(spectrum, axis=1)[:, :max_lag].astype(np.float32)
+        lags = autocorr[:, min_lag:max_lag]
+        best = np.argmax(lags, axis=1)
+        strength[start:stop] = lags[np.arange(len(lags)), best] / (autocorr[:, 0] + 1e-12)
+        f0[start:stop] = sample_rate / (best + min_lag)
+
+        # Spectral flatness: near 0 for tonal (clear voiced) speech, near 1 for noise
+        log_mean = np.mean(np.log(spectrum + 1e-12), axis=1)
+        flatness[start:stop] = np.exp(log_mean) / (np.mean(spectrum, axis=1) + 1e-12)
+    return f0, strength, flatness
+
+
+def extract_features(samples: np.ndarray, sample_rate: int = SAMPLE_RATE) -> dict:
+    """Computes loudness, pitch, speaking-rate and spectral features for a recording."""
+    return _extract(samples, sample_rate)[0]
+
+
+def _extract(samples: np.ndarray, sample_rate: int = SAMPLE_RATE):
+    """extract_features plus the per-frame speech mask it was computed from."""
+    frames = frame_signal(samples, sample_rate)
+
+    # Loudness
+    rms_db = frame_loudness_db(frames)
+    voiced = speech_mask(rms_db)
+    voiced_ratio = float(voiced.mean())
+
+    f0, strength, flatness = _spectral_tracks(frames, sample_rate)
+    pitched = voiced & (strength > 0.3)
+    f0_voiced = f0[pitched].astype(np.float64)
+
+    if len(f0_voiced) >= 5:
+        semitones = 12 * np.log2(f0_voiced / np.median(f0_voiced))
+        pitch_range_st = float(np.percentile(semitones, 95) - np.percentile(semitones, 5))
+        pitch_std_st = float(np.std(semitones))
+        pitch_median_hz = float(np.median(f0_voiced))
+    else:
+        pitch_range_st = pitch_std_st = pitch_median_hz = 0.0
+
+    spectral_flatness = float(np.mean(flatness[voiced], dtype=np.float64)) if voiced.any() else 1.0
+
+    # Speaking rate: syllable nuclei approximated by peaks of the smoothed loudness envelope
+    # (np.convolve's "same" output takes the longer input's length, so trim for clips under 5 frames)
+    envelope = np.convolve(rms_db, np.ones(5) / 5, mode="same")[:len(rms_db)]
+    peaks = np.zeros_like(voiced)
+    peaks[1:-1] = (envelope[1:-1] > envelope[:-2]) & (envelope[1:-1] >= envelope[2:]) & voiced[1:-1]
+    frames_per_second = int(1 / HOP_SECONDS)
+    n_seconds = len(peaks) // frames_per_second
+    if n_seconds >= 2:
+        per_second = peaks[:n_seconds * frames_per_second].reshape(n_seconds, frames_per_second).sum(axis=1)
+        speaking = per_second[per_second > 0]
+        rate_mean = float(speaking.mean()) if len(speaking) else 0.0
+        rate_cv = float(speaking.std() / rate_mean) if rate_mean else 0.0
+    else:
+        rate_mean = rate_cv = 0.0
+
+    loud = rms_db[voiced].astype(np.float64)
+    features = {
+        "duration_seconds": round(len(samples) / sample_rate, 2),
+        "voiced_ratio": round(voiced_ratio, 3),
+        "loudness_mean_db": round(float(loud.mean()), 2) if len(loud) else -100.0,
+        "loudness_std_db": round(float(loud.std()), 2) if len(loud) else 0.0,
+        "pitch_median_hz": round(pitch_median_hz, 1),
+        "pitch_range_semitones": round(pitch_range_st, 2),
+        "pitch_std_semitones": round(pitch_std_st, 2),
+        "syllable_rate_per_second": round(rate_mean, 2),
+        "speaking_rate_cv": round(rate_cv, 3),
+        "spectral_flatness": round(spectral_flatness, 4)
+    }
+    return features, voiced
+
+
+def label_features(features: dict) -> dict:
+    """Maps raw prosody features onto the tone-analysis label schema."""
+    pitch_range = features["pitch_range_semitones"]
+    loudness_std = features["loudness_std_db"]
+    voiced_ratio = features["voiced_ratio"]
+    flatness = features["spectral_flatness"]
+    rate_cv = features["speaking_rate_cv"]
+
+    if pitch_range >= 8 and loudness_std >= 6:
+        energy = "high"
+    elif pitch_range < 4 or voiced_ratio < 0.3:
+        energy = "low"
+    else:
+        energy = "moderate"
+
+    if flatness < 0.15 and voiced_ratio >= 0.4:
+        clarity = "clear"
+    elif flatness > 0.35:
+        clarity = "unclear"
+    else:
+        clarity = "somewhat clear"
+
+    if rate_cv < 0.5 and pitch_range >= 4 and voiced_ratio >= 0.5:
+        confidence = "high"
+    elif rate_cv > 0.9 or voiced_ratio < 0.35:
+        confidence = "low"
+    else:
+        confidence = "medium"
+
+    if confidence == "low":
+        tone, emotion = "hesitant", "uncertain"
+    elif energy == "high":
+        tone, emotion = "enthusiastic", "excited"
+    else:
+        tone, emotion = "professional", "calm"
+
+    return {
+        "confidence_level": confidence,
+        "tone": tone,
+        "energy": energy,
+        "clarity": clarity,
+        "emotion": emotion
+    }
+
+
+def analyze_prosody(file_path: str) -> dict:
+    """Local replacement for the model tone call: same labels, plus the raw features."""
+    samples = decode_pcm(file_path)
+    features = extract_features(samples)
+    result = label_features(features)
+    result["features"] = features
+    result["source"] = "prosody"
+    return result
+
+
+def speech_frame_times(file_path: str) -> np.ndarray:
+    """Start time in seconds of every frame speech_mask counts as speech."""
+    rms_db = frame_loudness_db(frame_signal(decode_pcm(file_path)))
+    return np.flatnonzero(speech_mask(rms_db)) * HOP_SECONDS
+
+
+def estimate_speech(file_path: str) -> dict:
+    """
+    Transcript-free stand-ins for the voice metrics: long pauses between speech
+    and a word count from syllable rate. Used when transcription can't finish in time.
+    """
+    features, speech = _extract(decode_pcm(file_path))
+
+    # Silent runs between the first and last speech frame
+    pause_count = 0
+    spoken = np.flatnonzero(speech)
+    if len(spoken) > 1:
+        gaps = np.diff(spoken) * HOP_SECONDS
+        pause_count = int(np.count_nonzero(gaps >= LONG_PAUSE_SECONDS))
+
+    speech_seconds = features["voiced_ratio"] * features["duration_seconds"]
+    words = features["syllable_rate_per_second"] * speech_seconds / SYLLABLES_PER_WORD
+    return {
+        "pause_count": pause_count,
+        "estimated_words": int(round(words)),
+        "speech_seconds": round(speech_seconds, 1)
+    }
@@ -0,0 +1,146 @@
+
+import os
+import re
+import sys
+import json
+import zlib
+import hashlib
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import Config
+
+# Tags describe what a question is about, so they count more than its wording
+TAG_WEIGHT = 2
+# Always asked first and last when the bank has them
+OPENER, CLOSING = "opener", "closing"
+
+
+def tokenize(text: str) -> list:
+    """Lowercase words with plurals folded, plus adjacent-word bigrams."""
+    words = re.findall(r"[a-z0-9][a-z0-9+#]*", text.lower())
+    words = [w[:-1] if len(w) > 4 and w.endswith("s") and not w.endswith("ss") else w for w in words]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def load_bank(path: str) -> list:
+    """
+    Reads a question bank in the questions.json format. Entries are either plain
+    strings or {"text", "category", "tags"} objects.
+    """
+    with open(path) as f:
+        entries = json.load(f).get("questions", [])
+    bank = []
+    for entry in entries:
+        if isinstance(entry, str):
+            entry = {"text": entry}
+        bank.append({"text": entry["text"], "category": entry.get("category", "general"), "tags": entry.get("tags", [])})
+    return bank
+
+
+class QuestionBank:
+    """
+    Ranks a curated question bank against a job description and resume locally.
+
+    Each question becomes a hashed TF-IDF vector (tokens bucketed by CRC32 into
+    Config.QUESTION_HASH_DIM columns, so there is no vocabulary to store). The
+    L2-normalized matrix and IDF weights are built once per bank version, saved
+    under Config.QUESTION_INDEX_DIR and memory-mapped on load; ranking is then a
+    single matrix-vector product.
+    """
+
+    def __init__(self, bank_path=None, index_dir=None, dim=None):
+        self.bank_path = bank_path or Config.QUESTION_BANK_PATH
+        self.index_dir = index_dir or Config.QUESTION_INDEX_DIR
+        self.dim = dim or Config.QUESTION_HASH_DIM
+        self.questions = load_bank(self.bank_path)
+        self.matrix, self.idf = self._load_or_build()
+
+    def _counts(self, token_lists: list) -> np.ndarray:
+        counts = np.zeros((len(token_lists), self.dim), dtype=np.float32)
+        for row, tokens in enumerate(token_lists):
+            for token in tokens:
+                counts[row, zlib.crc32(token.encode("utf-8")) % self.dim] += 1
+        return counts
+
+    def _document_tokens(self, question: dict) -> list:
+        tokens = tokenize(question["text"])
+        for tag in question["tags"]:
+            tokens += tokenize(tag) * TAG_WEIGHT
+        return tokens
+
+    def _load_or_build(self):
+        with open(self.bank_path, "rb") as f:
+            version = hashlib.sha256(f.read() + str(self.dim).encode()).hexdigest()[:16]
+        matrix_path = os.path.join(self.index_dir, f"question_bank_{version}.npy")
+        idf_path = os.path.join(self.index_dir, f"question_bank_{version}.idf.npy")
+
+        if not (os.path.exists(matrix_path) and os.path.exists(idf_path)):
+            print(f"[INFO] Building question bank index ({len(self.questions)} questions)...")
+            counts = self._counts([self._document_tokens(q) for q in self.questions])
+            df = np.count_nonzero(counts, axis=0)
+            idf = (np.log((1 + len(counts)) / (1 + df)) + 1).astype(np.float32)
+            weights = np.log1p(counts) * idf
+            weights /= np.linalg.norm(weights, axis=1, keepdims=True) + 1e-12
+
+            os.makedirs(self.index_dir, exist_ok=True)
+            # Written under a temp name first so a concurrent reader never maps a partial file
+            for path, array in ((matrix_path, weights), (idf_path, idf)):
+                tmp_path = f"{path}.{os.getpid()}.tmp.npy"
+                np.save(tmp_path, array)
+                os.replace(tmp_path, path)
+
+        return np.load(matrix_path, mmap_mode="r"), np.load(idf_path, mmap_mode="r")
+
+    def query_vector(self, *weighted_texts) -> np.ndarray:
+        """Unit-length query from (text, weight) pairs; each text is normalized before weighting."""
+        query = np.zeros(self.dim, dtype=np.float32)
+        for text, weight in weighted_texts:
+            if not text:
+                continue
+            vector = np.log1p(self._counts([tokenize(text)])[0]) * self.idf
+            norm = np.linalg.norm(vector)
+            if norm > 0:
+                query += weight * vector / norm
+        norm = np.linalg.norm(query)
+        return query / norm if norm > 0 else query
+
+    def select(self, job_description: str, resume_text: str = "", count: int = None) -> list:
+        """
+        The count best-matching questions in interview order: the best opener,
+        then the top-ranked questions (at most Config.QUESTION_MAX_PER_CATEGORY
+        per category), then the best closing question.
+        """
+        count = count or Config.QUESTION_COUNT
+        query = self.query_vector((job_description, 1.0), (resume_text, Config.QUESTION_RESUME_WEIGHT))
+        scores = self.matrix @ query
+        # Stable sort keeps bank order between equally relevant questions
+        ranked = [self.questions[i] for i in np.argsort(-scores, kind="stable")]
+
+        opener = next((q for q in ranked if q["category"] == OPENER), None)
+        closing = next((q for q in ranked if q["category"] == CLOSING), None)
+        middle_count = count - (opener is not None) - (closing is not None)
+
+        middle, per_category = [], {}
+        for question in ranked:
+            if len(middle) >= middle_count:
+                break
+            category = question["category"]
+            if category in (OPENER, CLOSING) or per_category.get(category, 0) >= Config.QUESTION_MAX_PER_CATEGORY:
+                continue
+            per_category[category] = per_category.get(category, 0) + 1
+            middle.append(question)
+
+        return ([opener] if opener else []) + middle + ([closing] if closing else [])
+
+    def matched_tags(self, questions: list, *texts) -> list:
+        """Tags of the chosen questions that actually appear in the job description or resume."""
+        haystack = " ".join(text.lower() for text in texts if text)
+        tags = []
+        for question in questions:
+            for tag in question["tags"]:
+                if tag not in tags and re.search(rf"(?<!\w){re.escape(tag)}(?!\w)", haystack):
+                    tags.append(tag)
+        return tags
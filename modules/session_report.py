@@ -0,0 +1,69 @@
+
+def new_aggregate() -> dict:
+    """Running totals for a whole interview, updated as each answer is analyzed."""
+    return {
+        "answers": {},
+        "answer_count": 0,
+        "total_words": 0,
+        "total_seconds": 0.0,
+        "total_fillers": 0,
+        "total_pauses": 0,
+        "wpm_sum": 0
+    }
+
+
+def _contribution(metrics: dict) -> dict:
+    return {
+        "words": metrics.get("word_count", 0),
+        "seconds": float(metrics.get("duration_seconds", 0) or 0),
+        "fillers": metrics.get("total_fillers", 0),
+        "pauses": metrics.get("pause_count", 0),
+        "wpm": metrics.get("pace_wpm", 0)
+    }
+
+
+def _apply(aggregate: dict, contribution: dict, sign: int):
+    aggregate["answer_count"] += sign
+    aggregate["total_words"] += sign * contribution["words"]
+    aggregate["total_seconds"] += sign * contribution["seconds"]
+    aggregate["total_fillers"] += sign * contribution["fillers"]
+    aggregate["total_pauses"] += sign * contribution["pauses"]
+    aggregate["wpm_sum"] += sign * contribution["wpm"]
+
+
+def add_answer(aggregate: dict, q_index: int, metrics: dict):
+    """
+    Folds one answer's voice metrics into the aggregate in O(1).
+    Re-analyzing an answer replaces its previous contribution.
+    """
+    previous = aggregate["answers"].get(q_index)
+    if previous is not None:
+        _apply(aggregate, previous, -1)
+
+    contribution = _contribution(metrics)
+    aggregate["answers"][q_index] = contribution
+    _apply(aggregate, contribution, 1)
+
+
+def remove_answer(aggregate: dict, q_index: int):
+    """Takes an answer's contribution back out, e.g. when its re-analysis failed."""
+    previous = aggregate["answers"].pop(q_index, None)
+    if previous is not None:
+        _apply(aggregate, previous, -1)
+
+
+def summarize(aggregate: dict) -> dict:
+    """Delivery stats across every analyzed answer."""
+    count = aggregate["answer_count"]
+    minutes = aggregate["total_seconds"] / 60.0
+    return {
+        "answers_analyzed": count,
+        "total_words": aggregate["total_words"],
+        "total_duration_seconds": round(aggregate["total_seconds"], 1),
+        "mean_wpm": round(aggregate["wpm_sum"] / count, 1) if count else 0,
+        "overall_wpm": round(aggregate["total_words"] / minutes, 1) if minutes > 0 else 0,
+        "total_fillers": aggregate["total_fillers"],
+        "fillers_per_minute": round(aggregate["total_fillers"] / minutes, 2) if minutes > 0 else 0,
+        "total_pauses": aggregate["total_pauses"],
+        "pauses_per_minute": round(aggregate["total_pauses"] / minutes, 2) if minutes > 0 else 0
+    }
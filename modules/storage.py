@@ -0,0 +1,263 @@
+
+import os
+import sys
+import json
+import time
+import uuid
+import shutil
+import hashlib
+import threading
+from collections import OrderedDict
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import Config
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class StorageManager:
+    """
+    Content-addressed artifact store under Config.STORAGE_DIR.
+
+    Files live at objects/<kind>/<d[:2]>/<d[2:4]>/<digest><ext>, so identical
+    uploads are stored once and no directory grows unbounded. Each kind has its
+    own TTL (Config.STORAGE_TTL_SECONDS), and once the store exceeds
+    Config.STORAGE_QUOTA_BYTES the least recently used files are evicted. A
+    daemon thread runs the sweep so request handlers never wait on it.
+    """
+
+    def __init__(self, root=None, quota_bytes=None, ttls=None):
+        self.root = root or Config.STORAGE_DIR
+        self.objects_dir = os.path.join(self.root, "objects")
+        self.tmp_dir = os.path.join(self.root, "tmp")
+        self.keys_path = os.path.join(self.root, "keys.json")
+        self.quota_bytes = quota_bytes if quota_bytes is not None else Config.STORAGE_QUOTA_BYTES
+        self.ttls = ttls if ttls is not None else Config.STORAGE_TTL_SECONDS
+
+        self.lock = threading.Lock()
+        # path -> {"kind", "size", "created", "last_access"}, least recently used first
+        self.index = OrderedDict()
+        self.total_bytes = 0
+        # "<kind>:<key>" -> path, for artifacts addressed by something other than content
+        self.keys = {}
+        # keys.json is written outside self.lock; versions let a writer skip a stale snapshot
+        self._keys_version = 0
+        self._keys_saved = 0
+        self._keys_write_lock = threading.Lock()
+        self._sweeper = None
+        self._stop = threading.Event()
+
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        """Rebuilds the index from disk; the layout itself is the source of truth."""
+        entries = []
+        for dirpath, _, filenames in os.walk(self.objects_dir):
+            kind = os.path.relpath(dirpath, self.objects_dir).split(os.sep)[0]
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                st = os.stat(path)
+                entries.append((max(st.st_atime, st.st_mtime), path, {
+                    "kind": kind,
+                    "size": st.st_size,
+                    "created": st.st_mtime,
+                    "last_access": max(st.st_atime, st.st_mtime)
+                }))
+        for _, path, entry in sorted(entries, key=lambda e: e[0]):
+            self.index[path] = entry
+            self.total_bytes += entry["size"]
+
+        try:
+            with open(self.keys_path, "r") as f:
+                self.keys = {k: p for k, p in json.load(f).items() if p in self.index}
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.keys = {}
+
+        # Leftovers from writes interrupted by a crash
+        for name in os.listdir(self.tmp_dir):
+            os.remove(os.path.join(self.tmp_dir, name))
+
+    def _save_keys(self):
+        """Persists the latest key map. Call without self.lock held."""
+        with self._keys_write_lock:
+            with self.lock:
+                if self._keys_version == self._keys_saved:
+                    return
+                keys, version = dict(self.keys), self._keys_version
+            tmp_path = self.keys_path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(keys, f)
+            os.replace(tmp_path, self.keys_path)
+            self._keys_saved = version
+
+    def object_path(self, kind, digest, ext):
+        return os.path.join(self.objects_dir, kind, digest[:2], digest[2:4], f"{digest}{ext}")
+
+    @staticmethod
+    def digest_of(path):
+        """The content hash of a stored path, taken from its filename."""
+        return os.path.splitext(os.path.basename(path))[0]
+
+    def _commit(self, tmp_path, digest, kind, ext, key):
+        path = self.object_path(kind, digest, ext)
+        with self.lock:
+            if path in self.index:
+                # Duplicate content: keep the existing copy
+                os.remove(tmp_path)
+                self._touch_locked(path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp_path, path)
+                now = time.time()
+                size = os.path.getsize(path)
+                self.index[path] = {"kind": kind, "size": size, "created": now, "last_access": now}
+                self.total_bytes += size
+            if key is not None and self.keys.get(f"{kind}:{key}") != path:
+                self.keys[f"{kind}:{key}"] = path
+                self._keys_version += 1
+        if key is not None:
+            self._save_keys()
+        return path
+
+    def put_stream(self, fileobj, kind, ext="", key=None, validate=None):
+        """
+        Copies a file-like object into the store, hashing as it goes. Returns the
+        stored path. validate(tmp_path) may raise to reject the file before it is
+        added; the temporary copy is removed and the exception propagates.
+        """
+        tmp_path = os.path.join(self.tmp_dir, uuid.uuid4().hex)
+        hasher = hashlib.sha256()
+        with open(tmp_path, "wb") as out:
+            while True:
+                chunk = fileobj.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                hasher.update(chunk)
+                out.write(chunk)
+        if validate is not None:
+            try:
+                validate(tmp_path)
+            except Exception:
+                os.remove(tmp_path)
+                raise
+        return self._commit(tmp_path, hasher.hexdigest(), kind, ext, key)
+
+    def put_file(self, src_path, kind, key=None, move=True):
+        """Adds an existing file to the store (moving it by default). Returns the stored path."""
+        ext = os.path.splitext(src_path)[1]
+        hasher = hashlib.sha256()
+        with open(src_path, "rb") as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                hasher.update(chunk)
+        tmp_path = os.path.join(self.tmp_dir, uuid.uuid4().hex)
+        if move:
+            shutil.move(src_path, tmp_path)
+        else:
+            shutil.copyfile(src_path, tmp_path)
+        return self._commit(tmp_path, hasher.hexdigest(), kind, ext, key)
+
+    def lookup(self, kind, key):
+        """Returns the stored path registered under key, or None if missing or evicted."""
+        with self.lock:
+            path = self.keys.get(f"{kind}:{key}")
+            if path is None or path not in self.index:
+                return None
+            self._touch_locked(path)
+            return path
+
+    def exists(self, path):
+        with self.lock:
+            return path in self.index
+
+    def touch(self, path):
+        with self.lock:
+            if path in self.index:
+                self._touch_locked(path)
+
+    def _touch_locked(self, path):
+        self.index[path]["last_access"] = time.time()
+        self.index.move_to_end(path)
+
+    def _evict_locked(self, path):
+        """Drops path from the index; the caller deletes the file after releasing the lock."""
+        entry = self.index.pop(path)
+        self.total_bytes -= entry["size"]
+
+    def _delete(self, path):
+        # Re-checked under the lock: the same content may have been stored again
+        # since it was evicted, and that new copy must survive.
+        with self.lock:
+            if path in self.index:
+                return
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def sweep(self):
+        """
+        Deletes expired artifacts, then evicts LRU artifacts until under quota.
+        Victims are picked under the lock; the files are deleted and keys.json is
+        rewritten afterwards, so lookups are never held up by a large sweep.
+        """
+        now = time.time()
+        expired = []
+        evicted = []
+        with self.lock:
+            for path, entry in list(self.index.items()):
+                ttl = self.ttls.get(entry["kind"])
+                if ttl is not None and now - entry["created"] > ttl:
+                    self._evict_locked(path)
+                    expired.append(path)
+
+            while self.total_bytes > self.quota_bytes and self.index:
+                path = next(iter(self.index))
+                self._evict_locked(path)
+                evicted.append(path)
+
+            if expired or evicted:
+                self.keys = {k: p for k, p in self.keys.items() if p in self.index}
+                self._keys_version += 1
+            total_bytes = self.total_bytes
+
+        for path in expired + evicted:
+            self._delete(path)
+        if expired or evicted:
+            self._save_keys()
+            print(f"[INFO] Storage sweep: {len(expired)} expired, {len(evicted)} evicted, {total_bytes} bytes in use")
+        return {"expired": len(expired), "evicted": len(evicted), "total_bytes": total_bytes}
+
+    def start_sweeper(self, interval=None):
+        """Runs sweep() every interval seconds on a daemon thread."""
+        if self._sweeper is not None:
+            return
+        interval = interval or Config.STORAGE_SWEEP_INTERVAL
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(interval):
+                try:
+                    self.sweep()
+                except Exception as e:
+                    print(f"[ERROR] Storage sweep failed: {e}")
+
+        self._sweeper = threading.Thread(target=run, name="storage-sweeper", daemon=True)
+        self._sweeper.start()
+
+    def stop_sweeper(self):
+        if self._sweeper is not None:
+            self._stop.set()
+            self._sweeper.join()
+            self._sweeper = None
+
+    def usage(self):
+        with self.lock:
+            by_kind = {}
+            for entry in self.index.values():
+                stats = by_kind.setdefault(entry["kind"], {"files": 0, "bytes": 0})
+                stats["files"] += 1
+                stats["bytes"] += entry["size"]
+            return {"total_bytes": self.total_bytes, "quota_bytes": self.quota_bytes, "by_kind": by_kind}
@@ -8,20 +8,16 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from google import genai
 from google.genai import types
 from config import Config
+from modules.model_scheduler import scheduler, INTERACTIVE
 
 class TextToSpeech:
     def __init__(self):
         self.client = genai.Client(
             api_key=Config.GEMINI_API_KEY
         )
+        Config.ensure_dirs()
 
-    def generate_audio(self, text, question_number):
-        """
-        Converts text to speech using Gemini 2.5 and saves it as a .wav file.
-        """
-        output_filename = f"question_{question_number}.wav"
-        output_path = os.path.join(Config.QUESTION_AUDIOS_DIR, output_filename)
-
+    def _request(self, text):
         # 2026 Gemini 2.5 TTS allows style prompting
         # Options: 'Charon' (Informative), 'Puck' (Upbeat), 'Kore' (Firm)
         config = types.GenerateContentConfig(
@@ -37,23 +33,55 @@ class TextToSpeech:
 
         # Style prompt: Tell the AI how to sound
         style_prompt = f"In a professional, clear, and slightly inquisitive tone, ask: {text}"
+        return dict(
+            model="gemini-2.5-flash-preview-tts", # Use a model with TTS capabilities
+            contents=style_prompt,
+            config=config
+        )
+
+    def _output_path(self, question_number):
+        output_filename = f"question_{question_number}.wav"
+        return os.path.join(Config.QUESTION_AUDIOS_DIR, output_filename)
+
+    def _write_wav(self, output_path, response):
+        # Save the PCM data to a WAV file
+        with wave.open(output_path, "wb") as wf:
+            wf.setnchannels(1)       # Mono
+            wf.setsampwidth(2)      # 16-bit
+            wf.setframerate(24000)  # Gemini standard rate
+            wf.writeframes(response.candidates[0].content.parts[0].inline_data.data)
+        return output_path
+
+    def generate_audio(self, text, question_number):
+        """
+        Converts text to speech using Gemini 2.5 and saves it as a .wav file.
+        """
+        output_path = self._output_path(question_number)
 
         try:
             print(f"Generating audio for: {text[:30]}...")
-            response = self.client.models.generate_content(
-                model="gemini-2.5-flash-preview-tts", # Use a model with TTS capabilities
-                contents=style_prompt,
-                config=config
+            # The candidate is waiting on this audio, so it jumps ahead of bulk analysis
+            response = scheduler.run(
+                self.client.models.generate_content,
+                priority=INTERACTIVE,
+                **self._request(text)
             )
+            return self._write_wav(output_path, response)
 
-            # Save the PCM data to a WAV file
-            with wave.open(output_path, "wb") as wf:
-                wf.setnchannels(1)       # Mono
-                wf.setsampwidth(2)      # 16-bit
-                wf.setframerate(24000)  # Gemini standard rate
-                wf.writeframes(response.candidates[0].content.parts[0].inline_data.data)
-                
-            return output_path
+        except Exception as e:
+            print(f"TTS Error: {e}")
+            return None
+
+    async def generate_audio_async(self, text, question_number):
+        """generate_audio on the client's aio interface; the WAV write runs on the I/O executor."""
+        from modules.executors import run_in, IO_EXECUTOR
+        output_path = self._output_path(question_number)
+
+        try:
+            print(f"Generating audio for: {text[:30]}...")
+            async with scheduler.async_slot(priority=INTERACTIVE):
+                response = await self.client.aio.models.generate_content(**self._request(text))
+            return await run_in(IO_EXECUTOR, self._write_wav, output_path, response)
 
         except Exception as e:
             print(f"TTS Error: {e}")
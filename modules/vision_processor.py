@@ -2,6 +2,7 @@
 import os
 import sys
 import json
+import math
 import time
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -9,21 +10,103 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from dotenv import load_dotenv
 load_dotenv()
 
+from config import Config
+from modules.model_scheduler import BULK
+from modules.gemini_files import generate_from_file, generate_from_file_async, parse_json_response
 
-def wait_for_file_active(genai_file, timeout=60):
-    """Wait for uploaded file to become ACTIVE state."""
-    import google.generativeai as genai
+VISION_PROMPT = """Watch this video and analyze the person's visual presentation. Return a JSON object:
+    - eye_contact: description of eye contact (e.g., "Maintained good eye contact with camera", "Frequently looked away")
+    - looking_away_frequency: "rarely", "sometimes", or "frequently"
+    - facial_expressions: what you observe (e.g., "Appeared confident and engaged", "Seemed nervous")
+    - confidence_visual: "high", "medium", or "low"
+    - body_language: brief description
+    - fidgeting: "none", "minimal", "noticeable", or "excessive"
+    - interest_level: "very engaged", "engaged", "neutral", or "disengaged"
+    - overall_impression: 1-2 sentence summary
     
-    start_time = time.time()
-    while time.time() - start_time < timeout:
-        file_status = genai.get_file(genai_file.name)
-        if file_status.state.name == "ACTIVE":
-            return True
-        elif file_status.state.name == "FAILED":
-            return False
-        print(f"[INFO] Waiting for file... ({file_status.state.name})")
-        time.sleep(2)
-    return False
+    Return ONLY valid JSON, no markdown."""
+
+
+def estimate_visuals(video_path: str, sample_fps: float = 2.0, max_frames: int = None,
+                     time_budget: float = None) -> dict:
+    """
+    Face-detector stand-in for the vision labels: how often a frontal face is
+    visible approximates eye contact, and how much it moves approximates fidgeting.
+    At most max_frames frames are run through the detector, spread over the whole
+    answer when the container reports its length, and sampling stops early once
+    time_budget seconds have passed.
+    """
+    try:
+        import cv2
+    except ImportError:
+        return {"error": "opencv-python is not installed"}
+
+    capture = cv2.VideoCapture(video_path)
+    if not capture.isOpened():
+        return {"error": f"Could not open video: {video_path}"}
+    detector = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+    # MediaRecorder webm often reports no or a bogus frame rate
+    fps = capture.get(cv2.CAP_PROP_FPS)
+    fps = fps if 1 <= fps <= 60 else 15
+    step = max(1, int(round(fps / sample_fps)))
+    max_frames = max_frames or Config.VISION_FALLBACK_MAX_FRAMES
+    frame_count = capture.get(cv2.CAP_PROP_FRAME_COUNT)
+    if frame_count > 0:
+        step = max(step, int(math.ceil(frame_count / max_frames)))
+    stop_at = time.monotonic() + (time_budget if time_budget is not None else Config.VISION_FALLBACK_SECONDS)
+
+    sampled, centers, index = 0, [], 0
+    while sampled < max_frames and time.monotonic() < stop_at and capture.grab():
+        index += 1
+        if (index - 1) % step:
+            continue
+        ok, frame = capture.retrieve()
+        if not ok:
+            continue
+        sampled += 1
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        faces = detector.detectMultiScale(gray, scaleFactor=1.2, minNeighbors=5, minSize=(40, 40))
+        if len(faces):
+            x, y, w, h = max(faces, key=lambda f: f[2] * f[3])
+            centers.append(((x + w / 2) / gray.shape[1], (y + h / 2) / gray.shape[0]))
+    capture.release()
+
+    if not sampled:
+        return {"error": "No frames decoded"}
+    facing = len(centers) / sampled
+    steps = [((a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2) ** 0.5 for a, b in zip(centers, centers[1:])]
+    movement = sum(steps) / len(steps) if steps else 0.0
+
+    if facing >= 0.85:
+        looking_away = "rarely"
+    elif facing >= 0.6:
+        looking_away = "sometimes"
+    else:
+        looking_away = "frequently"
+    if movement < 0.01:
+        fidgeting = "none"
+    elif movement < 0.03:
+        fidgeting = "minimal"
+    elif movement < 0.06:
+        fidgeting = "noticeable"
+    else:
+        fidgeting = "excessive"
+    if facing >= 0.85 and movement < 0.03:
+        confidence = "high"
+    elif facing < 0.6 or movement >= 0.06:
+        confidence = "low"
+    else:
+        confidence = "medium"
+
+    return {
+        "eye_contact": f"Facing the camera in {facing:.0%} of sampled frames",
+        "looking_away_frequency": looking_away,
+        "confidence_visual": confidence,
+        "fidgeting": fidgeting,
+        "interest_level": "engaged" if facing >= 0.6 else "neutral",
+        "overall_impression": "Estimated locally from face position; the full visual analysis did not finish in time.",
+        "degraded": True
+    }
 
 
 class VisionProcessor:
@@ -34,53 +117,49 @@ class VisionProcessor:
         """Analyze video for eye contact, expressions, confidence."""
         if not os.path.exists(video_path):
             return {"error": f"Video not found: {video_path}"}
-        
+
+        if not self.api_key:
+            return {"error": "GEMINI_API_KEY not configured"}
+
+        try:
+            print(f"[INFO] Uploading video for vision analysis...")
+            return self._parse(generate_from_file(self.api_key, video_path, VISION_PROMPT, priority=BULK))
+        except Exception as e:
+            print(f"[ERROR] Vision analysis failed: {e}")
+            return {"error": str(e)}
+
+    async def analyze_video_async(self, video_path: str) -> dict:
+        """
+        analyze_video on the SDK's async client, hedged and bounded by the request
+        deadline. Falls back to estimate_visuals.
+        """
+        from modules.hedging import hedger
+        from modules.executors import run_in, CPU_EXECUTOR
+        return await hedger.run(
+            "vision",
+            lambda: self._analyze_video_once_async(video_path),
+            lambda: run_in(CPU_EXECUTOR, estimate_visuals, video_path)
+        )
+
+    async def _analyze_video_once_async(self, video_path: str) -> dict:
+        """One vision attempt."""
+        if not os.path.exists(video_path):
+            return {"error": f"Video not found: {video_path}"}
+
         if not self.api_key:
             return {"error": "GEMINI_API_KEY not configured"}
-        
+
         try:
-            import google.generativeai as genai
-            genai.configure(api_key=self.api_key)
-            
             print(f"[INFO] Uploading video for vision analysis...")
-            video_file = genai.upload_file(video_path)
-            
-            # Wait for file to become active
-            if not wait_for_file_active(video_file):
-                return {"error": "Video upload failed - file not ready"}
-            
-            print("[INFO] Video ready, analyzing...")
-            model = genai.GenerativeModel("gemini-2.0-flash")
-            
-            response = model.generate_content([
-                """Watch this video and analyze the person's visual presentation. Return a JSON object:
-                - eye_contact: description of eye contact (e.g., "Maintained good eye contact with camera", "Frequently looked away")
-                - looking_away_frequency: "rarely", "sometimes", or "frequently"
-                - facial_expressions: what you observe (e.g., "Appeared confident and engaged", "Seemed nervous")
-                - confidence_visual: "high", "medium", or "low"
-                - body_language: brief description
-                - fidgeting: "none", "minimal", "noticeable", or "excessive"
-                - interest_level: "very engaged", "engaged", "neutral", or "disengaged"
-                - overall_impression: 1-2 sentence summary
-                
-                Return ONLY valid JSON, no markdown.""",
-                video_file
-            ])
-            
-            try:
-                video_file.delete()
-            except:
-                pass
-            
-            text = response.text.strip()
-            if text.startswith("```"):
-                text = text.split("\n", 1)[1].rsplit("```", 1)[0]
-            
-            result = json.loads(text)
-            print(f"[INFO] Vision analysis complete")
-            return result
-            
-        except json.JSONDecodeError as e:
+            return self._parse(await generate_from_file_async(self.api_key, video_path, VISION_PROMPT, priority=BULK))
+        except Exception as e:
+            print(f"[ERROR] Vision analysis failed: {e}")
+            return {"error": str(e)}
+
+    def _parse(self, text: str) -> dict:
+        try:
+            result = parse_json_response(text)
+        except (json.JSONDecodeError, IndexError):
             print(f"[ERROR] Failed to parse vision response")
             return {
                 "eye_contact": "Could not analyze",
@@ -88,9 +167,8 @@ class VisionProcessor:
                 "looking_away_frequency": "unknown",
                 "overall_impression": "Analysis incomplete"
             }
-        except Exception as e:
-            print(f"[ERROR] Vision analysis failed: {e}")
-            return {"error": str(e)}
+        print(f"[INFO] Vision analysis complete")
+        return result
 
 
 if __name__ == "__main__":
@@ -2,9 +2,16 @@
 import os
 import re
 import json
-import time
+import sys
+import asyncio
 from dotenv import load_dotenv
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import Config
+from modules.model_scheduler import BULK
+from modules.gemini_files import generate_from_file, generate_from_file_async, parse_json_response
+
 load_dotenv()
 
 FILLER_PHRASES = [
@@ -53,20 +60,38 @@ def extract_metrics(transcript: str, segments: list = None, duration_seconds: fl
     }
 
 
-def wait_for_file_active(genai_file, timeout=60):
-    """Wait for uploaded file to become ACTIVE state."""
-    import google.generativeai as genai
-    
-    start_time = time.time()
-    while time.time() - start_time < timeout:
-        file_status = genai.get_file(genai_file.name)
-        if file_status.state.name == "ACTIVE":
-            return True
-        elif file_status.state.name == "FAILED":
-            return False
-        print(f"[INFO] Waiting for file to be ready... ({file_status.state.name})")
-        time.sleep(2)
-    return False
+TRANSCRIBE_PROMPT = """Listen to this recording carefully and provide:
+            
+1. TRANSCRIPT: Transcribe EXACTLY what the person says, word for word. Include all filler words like "um", "uh", "like", etc.
+
+2. PAUSE_COUNT: Count the number of significant pauses (silence or hesitation of 2+ seconds) during the response. This includes:
+   - Long gaps before starting to speak
+   - Pauses mid-sentence where the speaker hesitates
+   - Moments of silence between thoughts
+
+Return your response in this exact format:
+TRANSCRIPT: [the transcript here]
+PAUSE_COUNT: [number]"""
+
+TONE_PROMPT = """Analyze the speaker's voice in this recording. Return a JSON object with:
+            - confidence_level: "high", "medium", or "low"
+            - tone: one of "professional", "casual", "nervous", "enthusiastic", "hesitant"
+            - energy: "high", "moderate", or "low"  
+            - clarity: "clear", "somewhat clear", or "unclear"
+            - emotion: main detected emotion
+            Return ONLY valid JSON."""
+
+
+def _estimate_duration(file_path: str) -> float:
+    # Fallback: estimate from file size (~50KB per second for webm)
+    try:
+        size = os.path.getsize(file_path)
+        return max(5.0, size / 50000)
+    except:
+        return 30.0
+
+
+FFPROBE_DURATION = ['ffprobe', '-v', 'quiet', '-show_entries', 'format=duration', '-of', 'csv=p=0']
 
 
 def get_video_duration(file_path: str) -> float:
@@ -74,7 +99,7 @@ def get_video_duration(file_path: str) -> float:
     try:
         import subprocess
         result = subprocess.run(
-            ['ffprobe', '-v', 'quiet', '-show_entries', 'format=duration', '-of', 'csv=p=0', file_path],
+            FFPROBE_DURATION + [file_path],
             capture_output=True, text=True, timeout=10
         )
         if result.returncode == 0 and result.stdout.strip():
@@ -82,12 +107,44 @@ def get_video_duration(file_path: str) -> float:
     except:
         pass
     
-    # Fallback: estimate from file size (~50KB per second for webm)
+    return _estimate_duration(file_path)
+
+
+async def get_video_duration_async(file_path: str) -> float:
+    """get_video_duration with ffprobe run as an asyncio subprocess."""
     try:
-        size = os.path.getsize(file_path)
-        return max(5.0, size / 50000)
+        proc = await asyncio.create_subprocess_exec(
+            *FFPROBE_DURATION, file_path,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL
+        )
+        stdout, _ = await asyncio.wait_for(proc.communicate(), timeout=10)
+        if proc.returncode == 0 and stdout.strip():
+            return float(stdout.strip())
     except:
-        return 30.0
+        pass
+
+    return _estimate_duration(file_path)
+
+
+def _parse_transcription(text: str) -> dict:
+    text = text.strip()
+    transcript = ""
+    pause_count = 0
+    
+    if "TRANSCRIPT:" in text:
+        parts = text.split("PAUSE_COUNT:")
+        transcript = parts[0].replace("TRANSCRIPT:", "").strip()
+        if len(parts) > 1:
+            try:
+                pause_count = int(parts[1].strip().split()[0])
+            except:
+                pause_count = 0
+    else:
+        transcript = text
+    
+    print(f"[INFO] Transcript: {transcript[:100]}...")
+    print(f"[INFO] Detected pauses: {pause_count}")
+    return {"text": transcript, "segments": [], "pause_count": pause_count}
 
 
 def transcribe_with_gemini(file_path: str) -> dict:
@@ -95,67 +152,56 @@ def transcribe_with_gemini(file_path: str) -> dict:
     api_key = os.getenv("GEMINI_API_KEY")
     if not api_key:
         return {"text": "", "segments": [], "pause_count": 0, "error": "No API key"}
-    
+
     try:
-        import google.generativeai as genai
-        genai.configure(api_key=api_key)
-        
         print(f"[INFO] Uploading file for transcription: {file_path}")
-        uploaded_file = genai.upload_file(file_path)
-        
-        # Wait for file to become active
-        if not wait_for_file_active(uploaded_file):
-            return {"text": "", "segments": [], "pause_count": 0, "error": "File upload failed"}
-        
-        print("[INFO] File ready, transcribing with pause detection...")
-        model = genai.GenerativeModel("gemini-2.0-flash")
-        
-        response = model.generate_content([
-            """Listen to this recording carefully and provide:
-            
-1. TRANSCRIPT: Transcribe EXACTLY what the person says, word for word. Include all filler words like "um", "uh", "like", etc.
+        return _parse_transcription(generate_from_file(api_key, file_path, TRANSCRIBE_PROMPT))
+    except Exception as e:
+        print(f"[ERROR] Transcription failed: {e}")
+        return {"text": "", "segments": [], "pause_count": 0, "error": str(e)}
 
-2. PAUSE_COUNT: Count the number of significant pauses (silence or hesitation of 2+ seconds) during the response. This includes:
-   - Long gaps before starting to speak
-   - Pauses mid-sentence where the speaker hesitates
-   - Moments of silence between thoughts
 
-Return your response in this exact format:
-TRANSCRIPT: [the transcript here]
-PAUSE_COUNT: [number]""",
-            uploaded_file
-        ])
-        
-        # Cleanup
-        try:
-            uploaded_file.delete()
-        except:
-            pass
-        
-        # Parse response
-        text = response.text.strip()
-        transcript = ""
-        pause_count = 0
-        
-        if "TRANSCRIPT:" in text:
-            parts = text.split("PAUSE_COUNT:")
-            transcript = parts[0].replace("TRANSCRIPT:", "").strip()
-            if len(parts) > 1:
-                try:
-                    pause_count = int(parts[1].strip().split()[0])
-                except:
-                    pause_count = 0
-        else:
-            transcript = text
-        
-        print(f"[INFO] Transcript: {transcript[:100]}...")
-        print(f"[INFO] Detected pauses: {pause_count}")
-        return {"text": transcript, "segments": [], "pause_count": pause_count}
-        
+async def transcribe_with_gemini_async(file_path: str) -> dict:
+    """
+    transcribe_with_gemini on the SDK's async client, hedged and bounded by the
+    request deadline. Falls back to a transcript-free local estimate.
+    """
+    from modules.hedging import hedger
+    return await hedger.run(
+        "transcribe",
+        lambda: _transcribe_once_async(file_path),
+        lambda: estimate_transcription_async(file_path)
+    )
+
+
+async def estimate_transcription_async(file_path: str) -> dict:
+    """Empty transcript with pause count and word estimate from the audio signal."""
+    from modules.executors import run_in, CPU_EXECUTOR
+    try:
+        from modules.prosody import estimate_speech
+        estimate = await run_in(CPU_EXECUTOR, estimate_speech, file_path)
+    except Exception as e:
+        return {"text": "", "segments": [], "pause_count": 0, "error": f"Transcription unavailable: {e}"}
+    return {
+        "text": "",
+        "segments": [],
+        "pause_count": estimate["pause_count"],
+        "estimated_words": estimate["estimated_words"],
+        "degraded": True
+    }
+
+
+async def _transcribe_once_async(file_path: str) -> dict:
+    """One transcription attempt."""
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        return {"text": "", "segments": [], "pause_count": 0, "error": "No API key"}
+
+    try:
+        print(f"[INFO] Uploading file for transcription: {file_path}")
+        return _parse_transcription(await generate_from_file_async(api_key, file_path, TRANSCRIBE_PROMPT))
     except Exception as e:
         print(f"[ERROR] Transcription failed: {e}")
-        import traceback
-        traceback.print_exc()
         return {"text": "", "segments": [], "pause_count": 0, "error": str(e)}
 
 
@@ -164,85 +210,174 @@ def analyze_audio_with_gemini(file_path: str) -> dict:
     api_key = os.getenv("GEMINI_API_KEY")
     if not api_key:
         return {}
-    
+
     try:
-        import google.generativeai as genai
-        genai.configure(api_key=api_key)
-        
         print(f"[INFO] Analyzing audio tone...")
-        uploaded_file = genai.upload_file(file_path)
-        
-        if not wait_for_file_active(uploaded_file):
-            return {"error": "File upload failed"}
-        
-        model = genai.GenerativeModel("gemini-2.0-flash")
-        
-        response = model.generate_content([
-            """Analyze the speaker's voice in this recording. Return a JSON object with:
-            - confidence_level: "high", "medium", or "low"
-            - tone: one of "professional", "casual", "nervous", "enthusiastic", "hesitant"
-            - energy: "high", "moderate", or "low"  
-            - clarity: "clear", "somewhat clear", or "unclear"
-            - emotion: main detected emotion
-            Return ONLY valid JSON.""",
-            uploaded_file
-        ])
-        
-        try:
-            uploaded_file.delete()
-        except:
-            pass
-        
-        text = response.text.strip()
-        if text.startswith("```"):
-            text = text.split("\n", 1)[1].rsplit("```", 1)[0]
-        
-        return json.loads(text)
-        
+        return parse_json_response(generate_from_file(api_key, file_path, TONE_PROMPT, priority=BULK))
     except Exception as e:
         print(f"[ERROR] Audio analysis failed: {e}")
         return {"confidence_level": "medium", "tone": "professional"}
 
 
-def process_file(file_path: str) -> dict:
-    """Process audio/video file and return full analysis."""
-    if not os.path.exists(file_path):
-        return {"error": f"File not found: {file_path}"}
-    
-    print(f"[INFO] Processing: {file_path}")
-    
-    # Get actual duration
-    duration = get_video_duration(file_path)
-    print(f"[INFO] Video duration: {duration:.1f}s")
-    
-    # 1. Transcribe
-    print("[INFO] Starting transcription...")
-    stt_result = transcribe_with_gemini(file_path)
+async def analyze_audio_with_gemini_async(file_path: str) -> dict:
+    """analyze_audio_with_gemini on the SDK's async client, hedged and bounded by the request deadline."""
+    from modules.hedging import hedger
+    return await hedger.run(
+        "tone",
+        lambda: _analyze_audio_once_async(file_path),
+        lambda: {"confidence_level": "medium", "tone": "professional", "degraded": True},
+        is_error=lambda result: not result or "error" in result
+    )
+
+
+async def _analyze_audio_once_async(file_path: str) -> dict:
+    """One tone-analysis attempt; errors are returned so the hedger can fall back."""
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        return {}
+
+    try:
+        print(f"[INFO] Analyzing audio tone...")
+        return parse_json_response(await generate_from_file_async(api_key, file_path, TONE_PROMPT, priority=BULK))
+    except Exception as e:
+        print(f"[ERROR] Audio analysis failed: {e}")
+        return {"error": str(e)}
+
+
+def analyze_tone(file_path: str) -> dict:
+    """
+    Tone labels from local prosody features. The model is only asked for the
+    emotion label when Config.PROSODY_MODEL_EMOTION is set, and is the fallback
+    if the audio cannot be decoded locally.
+    """
+    try:
+        from modules.prosody import analyze_prosody
+        analysis = analyze_prosody(file_path)
+    except Exception as e:
+        print(f"[WARN] Local prosody analysis failed ({e}), falling back to Gemini")
+        return analyze_audio_with_gemini(file_path)
+
+    if Config.PROSODY_MODEL_EMOTION:
+        emotion = analyze_audio_with_gemini(file_path).get("emotion")
+        if emotion:
+            analysis["emotion"] = emotion
+    return analysis
+
+
+async def analyze_tone_async(file_path: str) -> dict:
+    """analyze_tone with the DSP on the CPU executor and any model call on the async client."""
+    from modules.executors import run_in, CPU_EXECUTOR
+    try:
+        from modules.prosody import analyze_prosody
+        analysis = await run_in(CPU_EXECUTOR, analyze_prosody, file_path)
+    except Exception as e:
+        print(f"[WARN] Local prosody analysis failed ({e}), falling back to Gemini")
+        return await analyze_audio_with_gemini_async(file_path)
+
+    if Config.PROSODY_MODEL_EMOTION:
+        emotion = (await analyze_audio_with_gemini_async(file_path)).get("emotion")
+        if emotion:
+            analysis["emotion"] = emotion
+    return analysis
+
+
+def apply_word_estimate(metrics: dict, stt_result: dict):
+    """Fills word count and pace from estimate_transcription_async's signal-based estimate."""
+    words = stt_result.get("estimated_words", 0)
+    minutes = max(metrics.get("duration_seconds", 0), 1.0) / 60.0
+    metrics["word_count"] = words
+    metrics["pace_wpm"] = int(round(words / minutes)) if words else 0
+    metrics["estimated"] = True
+
+
+def transcription_error(stt_result: dict):
+    """
+    Why a transcription result has no usable speech, or None if it has some.
+    Without a transcript or a word estimate the metrics would read 0 words at 0 WPM.
+    """
+    if stt_result.get("text") or stt_result.get("estimated_words"):
+        return None
+    return stt_result.get("error") or "No speech transcribed"
+
+
+def _voice_result(stt_result: dict, duration: float, analysis: dict) -> dict:
     transcript = stt_result.get("text", "")
     segments = stt_result.get("segments", [])
     
     if not transcript:
         print("[WARN] No transcript generated")
     
-    # Get pause count from transcription
-    pause_count = stt_result.get("pause_count", 0)
-    
     # 2. Extract metrics
     print("[INFO] Extracting metrics...")
     metrics = extract_metrics(transcript, segments, duration_seconds=duration)
     # Override pause_count with Gemini's detection
-    metrics["pause_count"] = pause_count
+    metrics["pause_count"] = stt_result.get("pause_count", 0)
+    if stt_result.get("degraded"):
+        # No transcript in time: pace comes from the signal-based word estimate
+        apply_word_estimate(metrics, stt_result)
     
-    # 3. Analyze audio tone
-    print("[INFO] Analyzing tone...")
-    analysis = analyze_audio_with_gemini(file_path)
-    
-    return {
+    result = {
         "transcript": transcript,
         "segments": segments,
         "metrics": metrics,
         "analysis": analysis
     }
+    error = transcription_error(stt_result)
+    if error:
+        result["error"] = error
+    return result
+
+
+def process_file(file_path: str, transcript: str = None, pause_count: int = None) -> dict:
+    """
+    Process audio/video file and return full analysis.
+
+    If a transcript was already produced (e.g. by live ingest), transcription is skipped.
+    """
+    if not os.path.exists(file_path):
+        return {"error": f"File not found: {file_path}"}
+    
+    print(f"[INFO] Processing: {file_path}")
+    
+    # Get actual duration
+    duration = get_video_duration(file_path)
+    print(f"[INFO] Video duration: {duration:.1f}s")
+    
+    # 1. Transcribe
+    if transcript is not None:
+        print("[INFO] Using transcript from live ingest")
+        stt_result = {"text": transcript, "segments": [], "pause_count": pause_count or 0}
+    else:
+        print("[INFO] Starting transcription...")
+        stt_result = transcribe_with_gemini(file_path)
+    
+    # 3. Analyze audio tone
+    print("[INFO] Analyzing tone...")
+    analysis = analyze_tone(file_path)
+    
+    return _voice_result(stt_result, duration, analysis)
+
+
+async def process_file_async(file_path: str, transcript: str = None, pause_count: int = None) -> dict:
+    """process_file for the event loop: duration, transcription and tone run concurrently."""
+    if not os.path.exists(file_path):
+        return {"error": f"File not found: {file_path}"}
+
+    print(f"[INFO] Processing: {file_path}")
+
+    async def transcribe():
+        if transcript is not None:
+            print("[INFO] Using transcript from live ingest")
+            return {"text": transcript, "segments": [], "pause_count": pause_count or 0}
+        print("[INFO] Starting transcription...")
+        return await transcribe_with_gemini_async(file_path)
+
+    duration, stt_result, analysis = await asyncio.gather(
+        get_video_duration_async(file_path), transcribe(), analyze_tone_async(file_path)
+    )
+    print(f"[INFO] Video duration: {duration:.1f}s")
+
+    return _voice_result(stt_result, duration, analysis)
 
 
 if __name__ == "__main__":
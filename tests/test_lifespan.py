@@ -0,0 +1,27 @@
+
+import os
+import sys
+
+from fastapi.testclient import TestClient
+
+# Add parent directory to path to find backend, modules and config
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.app import create_app
+from backend.services import Services
+from modules.storage import StorageManager
+from modules.analytics import AnalyticsStore
+
+
+def build_services(tmp_path, name):
+    return Services(
+        storage=StorageManager(root=str(tmp_path / name / "store")),
+        analytics=AnalyticsStore(root=str(tmp_path / name / "analytics"))
+    )
+
+
+def test_apps_can_start_one_after_another(tmp_path):
+    # Shutting down one app must leave the process-wide executors usable by the next
+    for name in ("first", "second"):
+        with TestClient(create_app(build_services(tmp_path, name), warm_up=False)) as client:
+            assert client.get("/api/health").json() == {"status": "ok"}
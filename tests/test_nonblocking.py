@@ -0,0 +1,119 @@
+
+import os
+import sys
+import time
+import wave
+import asyncio
+
+import httpx
+
+# Add parent directory to path to find backend, modules and config
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.app import create_app
+from backend.services import Services
+from modules.storage import StorageManager
+from modules.analytics import AnalyticsStore
+from modules.executors import run_in, MODEL_EXECUTOR
+from modules import session_report
+
+# Each analysis is held up this long by its fake model stages
+ANALYSIS_SECONDS = 3.0
+CONCURRENT_ANALYSES = 3
+# Health and audio must answer within this while the analyses are running
+FAST_SECONDS = 0.5
+
+
+class SlowVision:
+    async def analyze_video_async(self, video_path):
+        await asyncio.sleep(ANALYSIS_SECONDS)
+        return {"eye_contact": "good", "confidence_visual": "high"}
+
+
+class SlowFeedback:
+    async def generate_feedback_async(self, transcript, voice_metrics, vision_metrics, question):
+        # A blocking SDK call, the way the real services run one: on the model executor
+        await run_in(MODEL_EXECUTOR, time.sleep, ANALYSIS_SECONDS)
+        return {"score": 80}
+
+
+class FakeTTS:
+    def __init__(self, directory):
+        self.directory = directory
+
+    async def generate_audio_async(self, text, question_number):
+        path = os.path.join(self.directory, f"{question_number}.wav")
+        with wave.open(path, "wb") as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(24000)
+            wf.writeframes(b"\0\0" * 24000)
+        return path
+
+
+def build_app(tmp_path):
+    sessions = {"s1": {
+        "questions": ["Tell me about yourself."] * CONCURRENT_ANALYSES,
+        "responses": {},
+        "aggregate": session_report.new_aggregate()
+    }}
+    for q_index in range(CONCURRENT_ANALYSES):
+        video_path = tmp_path / f"answer_{q_index}.webm"
+        video_path.write_bytes(b"\x1a\x45\xdf\xa3" + os.urandom(2048))
+        sessions["s1"]["responses"][q_index] = {"video_path": str(video_path), "duration_seconds": 10, "analyzed": False}
+
+    services = Services(
+        sessions=sessions,
+        vision=SlowVision(),
+        feedback_gen=SlowFeedback(),
+        tts=FakeTTS(str(tmp_path)),
+        storage=StorageManager(root=str(tmp_path / "store")),
+        analytics=AnalyticsStore(root=str(tmp_path / "analytics"))
+    )
+    return create_app(services, warm_up=False)
+
+
+async def timed_get(client, url):
+    started = time.perf_counter()
+    response = await client.get(url)
+    return response, time.perf_counter() - started
+
+
+def test_health_and_audio_stay_fast_during_analyses(tmp_path, monkeypatch):
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    app = build_app(tmp_path)
+    audio_url = "/api/interview/s1/question/0/audio"
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=30) as client:
+            # Synthesize the question audio up front so the timed request is a plain read
+            response = await client.get(audio_url)
+            assert response.status_code == 200
+
+            analyses = [
+                asyncio.create_task(client.post(f"/api/interview/s1/analyze/{q_index}"))
+                for q_index in range(CONCURRENT_ANALYSES)
+            ]
+
+            # Probe for as long as any analysis is running, so every stage is covered
+            probes = []
+            while not all(task.done() for task in analyses):
+                await asyncio.sleep(0.1)
+                probes.append(await timed_get(client, "/api/health"))
+                probes.append(await timed_get(client, audio_url))
+
+            results = await asyncio.gather(*analyses)
+            return probes, results
+
+    probes, results = asyncio.run(scenario())
+
+    # Voice/vision then feedback each take ANALYSIS_SECONDS, so there is plenty to probe
+    assert len(probes) >= 20
+
+    for response, elapsed in probes:
+        assert response.status_code == 200
+        assert elapsed < FAST_SECONDS, f"{response.request.url.path} took {elapsed:.2f}s during analyses"
+    for response in results:
+        assert response.status_code == 200
+        assert response.json()["feedback"] == {"score": 80}